@@ -1,21 +1,166 @@
-from backend.lego_db import LegoDBInterface, BasicModel, LegoPart
-from backend.lego_db.db_converter import BaseRepoManager, LegoPartRepoManager
+from backend.lego_db import LegoDBInterface, BasicModel, LegoPart, Color, TemplateMinifigure
+from backend.lego_db.db_converter import BaseRepoManager
+from backend.file_reader.converter.conversion_rules import CONVERSION_RULES, ColumnRule
+from dataclasses import dataclass
+from typing import Callable, Iterable
+import re
+
+# --- Coercions ---
+# bekommen den getrimmten, nicht leeren Wert einer Zelle
+def _text(value: str) -> str:
+    return value
+
+def _number(value: str) -> str:
+    # Tabellenkalkulationen speichern IDs gerne als "12.0"
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError(f"'{value}' is not a whole number")
+    return str(int(number))
+
+def _rgb(value: str) -> str:
+    value = value.lstrip("#").upper()
+    if not re.fullmatch(r"[0-9A-F]{6}", value):
+        raise ValueError(f"'{value}' is not a rgb value")
+    return value
+
+def _year(value: str) -> str:
+    match = re.search(r"\d{4}", value)
+    if not match:
+        raise ValueError(f"'{value}' is not a year")
+    return match.group()
+
+COERCIONS: dict[str, Callable[[str], str]] = {
+    "text": _text,
+    "number": _number,
+    "rgb": _rgb,
+    "year": _year,
+}
+
+# eine Regel, gebunden an die Spalten einer Datei
+@dataclass(frozen=True)
+class _FieldPlan:
+    field_name: str
+    rule: ColumnRule
+    convert: Callable[[str], str]
 
 class BaseConversionManager:
+    """
+    Builds models from csv rows by the CONVERSION_RULES of one source.
+
+    The rules are compiled once per file (on the first row), referenced models
+    are resolved with one query per batch.
+    """
+    entity: str
+    model_cls: type[BasicModel]
     repo_mng : BaseRepoManager
 
-    def __init__(self, db):
-        self.repo_mng = BaseRepoManager(db)
+    def __init__(self, db, source: str = "rebrickable"):
+        self.source = source
+        try:
+            self.rules: dict[str, ColumnRule] = CONVERSION_RULES[source][self.entity]
+        except KeyError:
+            raise ValueError(f"No conversion rules for '{self.entity}' from '{source}'")
+        for rule in self.rules.values():
+            if rule.convert not in COERCIONS:
+                raise ValueError(f"Unknown conversion '{rule.convert}' for column '{rule.column}'")
+
+        self.managers = LegoDBInterface(db).managers
+        self.repo_mng = self.managers[self.entity]
+        self._plan: list[_FieldPlan] | None = None
+
+    def compile(self, columns: Iterable[str]) -> list[_FieldPlan]:
+        """Bind the rules to the columns of a file, required columns must be present"""
+        columns = set(columns)
+        required = {f.name for f in self.model_cls.creation_fields()}
+
+        plan = []
+        for field_name, rule in self.rules.items():
+            if rule.column not in columns:
+                if field_name in required:
+                    raise ValueError(f"CSV is missing column '{rule.column}'")
+                continue
+            plan.append(_FieldPlan(field_name, rule, COERCIONS[rule.convert]))
+        self._plan = plan
+        return plan
+
+    def model_from_dict(self, data: dict) -> BasicModel:
+        models, errors = self.models_from_rows([data])
+        if errors:
+            raise errors[0][1]
+        return models[0]
+
+    def models_from_rows(self, rows: list[dict]) -> tuple[list[BasicModel], list[tuple[int, Exception]]]:
+        """Convert one batch, returns the models and (index in rows, error) for rows that failed"""
+        if not rows:
+            return [], []
+        if self._plan is None:
+            self.compile(rows[0].keys())
+
+        # 1. Spalten umbenennen und Werte umwandeln
+        values: list[dict | None] = []
+        errors: list[tuple[int, Exception]] = []
+        for i, row in enumerate(rows):
+            try:
+                model_dict = {}
+                for step in self._plan:
+                    value = row.get(step.rule.column, "")
+                    if value != "":
+                        model_dict[step.field_name] = step.convert(value)
+                values.append(model_dict)
+            except ValueError as e:
+                values.append(None)
+                errors.append((i, e))
+
+        # 2. referenzierte Models für den ganzen Batch mit einer Abfrage laden
+        references = {
+            step.field_name: self._reference_index(step.rule, {v[step.field_name] for v in values if v and step.field_name in v})
+            for step in self._plan if step.rule.reference
+        }
+
+        # 3. Models bauen
+        models: list[BasicModel] = []
+        for i, model_dict in enumerate(values):
+            if model_dict is None:
+                continue
+            try:
+                for field_name, index in references.items():
+                    if field_name not in model_dict:
+                        continue
+                    key = model_dict[field_name]
+                    if key not in index:
+                        rule = self.rules[field_name]
+                        raise ValueError(f"Unknown {rule.reference} {rule.reference_key} '{key}'")
+                    model_dict[field_name] = index[key]
+                models.append(self.model_cls(**model_dict))
+            except (ValueError, TypeError) as e:
+                errors.append((i, e))
+
+        errors.sort(key=lambda error: error[0])
+        return models, errors
+
+    def _reference_index(self, rule: ColumnRule, keys: set[str]) -> dict[str, BasicModel]:
+        # reference_key -> Model, nur für die Schlüssel des Batches
+        if not keys:
+            return {}
+        mng = self.managers[rule.reference]
+        models = mng.find_models(mng.query().is_in(rule.reference_key, sorted(keys)))
+        return {getattr(model, rule.reference_key): model for model in models}
+
+class ColorConversionManager(BaseConversionManager):
+    entity = "colors"
+    model_cls = Color
 
-    def model_from_dict(self, data: dict, name_conversion: dict[str, str]) -> BasicModel:
-        model_dict = {}
-        for key, value in data.items():
-            model_dict[name_conversion[key]] = value
+class LegoPartConversionManager(BaseConversionManager):
+    entity = "lego_parts"
+    model_cls = LegoPart
 
-class LegoPartConversionManager:
-    
-    def __init__(self, db):
-        self.repo_mng = LegoPartRepoManager(db)
+class TemplateMinifigureConversionManager(BaseConversionManager):
+    entity = "template_minifigures"
+    model_cls = TemplateMinifigure
 
-    def model_from_dict(self, data: dict, name_conversion: dict[str, str]) -> LegoPart:
-        pass
\ No newline at end of file
+# Tabellen, die per CSV importiert werden können
+CONVERSION_MANAGERS: dict[str, type[BaseConversionManager]] = {
+    "colors": ColorConversionManager,
+    "lego_parts": LegoPartConversionManager,
+    "template_minifigures": TemplateMinifigureConversionManager,
+}
@@ -1,7 +1,40 @@
-CONVERSION_RULES = {
+from dataclasses import dataclass
+
+# wie ein Feld des Models aus einer Spalte der CSV gelesen wird
+@dataclass(frozen=True)
+class ColumnRule:
+    column: str
+    convert: str = "text"               # Name in COERCIONS
+    reference: str | None = None        # Tabelle des referenzierten Models
+    reference_key: str | None = None    # Spalte, über die das referenzierte Model gefunden wird
+
+# pro Quelle und Tabelle: Modellfeld -> Regel
+CONVERSION_RULES: dict[str, dict[str, dict[str, ColumnRule]]] = {
+    # Rebrickable Downloads (parts.csv, elements.csv, inventory_parts.csv)
     "rebrickable": {
         "lego_parts": {
-            "bricklink_part_id": "part_num"
-        }
-    }
-}
\ No newline at end of file
+            "bricklink_part_id": ColumnRule("part_num"),
+            "description": ColumnRule("name"),
+            "lego_element_id": ColumnRule("element_id", "number"),
+            "bricklink_color": ColumnRule("color_id", "number", reference="colors", reference_key="rebrickable_color_id"),
+        },
+    },
+    # BrickLink Katalog Downloads als CSV
+    "bricklink": {
+        "colors": {
+            "bricklink_color_id": ColumnRule("Color ID", "number"),
+            "name": ColumnRule("Color Name"),
+            "rgb_value": ColumnRule("RGB", "rgb"),
+        },
+        "lego_parts": {
+            "bricklink_part_id": ColumnRule("Number"),
+            "description": ColumnRule("Name"),
+            "bricklink_color": ColumnRule("Color ID", "number", reference="colors", reference_key="bricklink_color_id"),
+        },
+        "template_minifigures": {
+            "bricklink_fig_id": ColumnRule("Number"),
+            "name": ColumnRule("Name"),
+            "year": ColumnRule("Year Released", "year"),
+        },
+    },
+}
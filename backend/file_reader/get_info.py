@@ -1,18 +1,113 @@
-from backend.file_reader.read_file import read_csv
-from backend.file_reader.converter.conversion_manager import BaseConversionManager
-from backend.lego_db import LegoDBInterface, BasicModel
+from backend.file_reader.read_file import iter_csv
+from backend.file_reader.converter.conversion_manager import BaseConversionManager, CONVERSION_MANAGERS
+from backend.file_reader.parallel_import import convert_parallel, Batch, DEFAULT_CHUNK_BYTES
+from backend.lego_db.db_converter import BaseRepoManager
+from backend.sql_api import DataBaseWrapper, iter_chunks, DEFAULT_CHUNK_SIZE
+from dataclasses import dataclass, field
+from typing import Iterable
+import os
+import shutil
+import tempfile
+import time
 
-def csv_converter(mng: BaseConversionManager, csv_data: list[dict]) -> list[BasicModel]:
-    models : list[BasicModel] = []
+# so viele Fehlermeldungen werden im Report aufgehoben, gezählt werden alle
+MAX_REPORTED_ERRORS = 20
 
-    for row in csv_data:
+# Ergebnis eines CSV Imports
+@dataclass
+class ImportReport:
+    rows: int = 0                                       # gelesene Zeilen
+    imported: int = 0                                   # geschriebene Models
+    skipped: int = 0                                    # schon vorhandene Models, nicht neu geschrieben
+    failed: int = 0                                     # Zeilen mit Fehler
+    seconds: float = 0.0
+    errors: list[str] = field(default_factory=list)     # die ersten MAX_REPORTED_ERRORS Fehler
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def add_error(self, row_number: int, error: Exception):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"row {row_number}: {error}")
+
+    def summary(self) -> str:
+        return (
+            f"{self.imported} of {self.rows} rows imported, {self.skipped} already existed, "
+            f"{self.failed} failed ({self.rows_per_sec:.0f} rows/sec)"
+        )
+
+def write_batches(
+        repo_mng: BaseRepoManager,
+        batches: Iterable[Batch],
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> ImportReport:
+    """Write converted batches, one transaction per batch, and count rows and errors"""
+    report = ImportReport()
+    start = time.perf_counter()
+
+    for models, errors, rows in batches:
+        for index, error in errors:
+            report.add_error(report.rows + index + 1, error)
+        first_row = report.rows + 1
+        report.rows += rows
+        if not models:
+            continue
         try:
-            model = mng.model_from_dict(row)
-            mng.repo_mng.add_model(model)
+            # schon vorhandene Models werden übersprungen, ein Import kann also wiederholt werden
+            written = repo_mng.add_models(models, chunk_size, ignore_existing=True)
+            report.imported += written
+            report.skipped += len(models) - written
         except Exception as e:
-            print(f"Data could not be parsed in row {row}: {e}")
+            # der Batch wurde zurückgerollt
+            report.failed += len(models)
+            if len(report.errors) < MAX_REPORTED_ERRORS:
+                report.errors.append(f"rows {first_row}-{report.rows}: {e}")
+
+    report.seconds = time.perf_counter() - start
+    return report
+
+def csv_converter(
+        mng: BaseConversionManager,
+        csv_data: Iterable[dict],
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> ImportReport:
+    """
+    Convert rows and write them chunk by chunk, one transaction per chunk.
+    Rows that can not be converted are counted and skipped.
+    """
+    batches = (
+        (*mng.models_from_rows(chunk), len(chunk))
+        for chunk in iter_chunks(csv_data, chunk_size)
+    )
+    return write_batches(mng.repo_mng, batches, chunk_size)
 
-    return models
+def import_csv(
+        file,
+        entity: str,
+        db: DataBaseWrapper,
+        source: str = "rebrickable",
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: int = None,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES
+) -> ImportReport:
+    """
+    Import an uploaded csv. With workers set, the file is parsed and converted
+    in that many processes (see parallel_import), otherwise in this process.
+    """
+    mng_cls = CONVERSION_MANAGERS.get(entity)
+    if mng_cls is None:
+        raise ValueError(f"CSV import is not supported for '{entity}'")
+    mng = mng_cls(db, source)
+    if not workers:
+        return csv_converter(mng, iter_csv(file), chunk_size)
 
-def import_csv(file):
-    return read_csv(file)
\ No newline at end of file
+    # die Worker lesen Byte-Bereiche, der Upload muss also als Datei vorliegen
+    with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as tmp:
+        shutil.copyfileobj(file.stream, tmp)
+    try:
+        batches = convert_parallel(tmp.name, entity, db, source, workers, chunk_bytes)
+        return write_batches(mng.repo_mng, batches, chunk_size)
+    finally:
+        os.remove(tmp.name)
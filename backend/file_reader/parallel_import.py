@@ -0,0 +1,99 @@
+from backend.file_reader.read_file import clean_row
+from backend.file_reader.converter.conversion_manager import BaseConversionManager, CONVERSION_MANAGERS
+from backend.lego_db import BasicModel
+from backend.sql_api import DataBaseWrapper, ConnectionSettings
+from concurrent.futures import ProcessPoolExecutor, Future
+from collections import deque
+from typing import Iterator
+import csv
+import io
+import os
+
+DEFAULT_CHUNK_BYTES = 1024 * 1024
+
+# Ergebnis eines Byte-Bereichs: Models, (Index der Zeile, Fehler), Anzahl Zeilen
+Batch = tuple[list[BasicModel], list[tuple[int, str]], int]
+
+def read_header(path: str, encoding: str = "utf-8-sig") -> tuple[list[str], int]:
+    """Column names and the byte offset of the first data row"""
+    with open(path, "rb") as f:
+        line = f.readline()
+    header = next(csv.reader([line.decode(encoding)]), None)
+    if not header:
+        raise ValueError("CSV hat keinen Header")
+    return [name.strip() for name in header], len(line)
+
+def split_byte_ranges(path: str, start: int, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> list[tuple[int, int]]:
+    """
+    Split the file after start into ranges of about chunk_bytes that end on a line break.
+    Rows must not contain line breaks inside quoted values.
+    """
+    if chunk_bytes < 1:
+        raise ValueError("chunk_bytes must be at least 1")
+    size = os.path.getsize(path)
+    ranges = []
+    with open(path, "rb") as f:
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+# --- Worker ---
+# pro Prozess ein Conversion Manager mit eigener Verbindung, die Regeln werden einmal kompiliert
+_worker_mng: BaseConversionManager | None = None
+_worker_header: list[str] = []
+_worker_path: str = ""
+
+def _init_worker(path: str, header: list[str], entity: str, source: str, db_name: str, settings: ConnectionSettings):
+    global _worker_mng, _worker_header, _worker_path
+    _worker_mng = CONVERSION_MANAGERS[entity](DataBaseWrapper(db_name, settings), source)
+    _worker_mng.compile(header)
+    _worker_header = header
+    _worker_path = path
+
+def _convert_range(byte_range: tuple[int, int]) -> Batch:
+    start, end = byte_range
+    with open(_worker_path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+    rows = [clean_row(row) for row in csv.DictReader(io.StringIO(text, newline=""), fieldnames=_worker_header)]
+    models, errors = _worker_mng.models_from_rows(rows)
+    return models, [(index, str(error)) for index, error in errors], len(rows)
+
+# --- Parent ---
+def convert_parallel(
+        path: str,
+        entity: str,
+        db: DataBaseWrapper,
+        source: str = "rebrickable",
+        workers: int = None,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES
+) -> Iterator[Batch]:
+    """
+    Parse and convert a csv file in a process pool.
+    Batches are yielded in file order, so the result equals the serial import.
+    """
+    if entity not in CONVERSION_MANAGERS:
+        raise ValueError(f"CSV import is not supported for '{entity}'")
+    header, start = read_header(path)
+    # Regeln und Spalten vorab prüfen, damit Fehler nicht erst in den Workern auftreten
+    CONVERSION_MANAGERS[entity](db, source).compile(header)
+
+    workers = workers or os.cpu_count() or 1
+    ranges = split_byte_ranges(path, start, chunk_bytes)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(path, header, entity, source, db.name, db.settings)
+    ) as executor:
+        # höchstens zwei Bereiche pro Worker gleichzeitig, damit der Speicher begrenzt bleibt
+        pending: deque[Future] = deque()
+        for byte_range in ranges:
+            pending.append(executor.submit(_convert_range, byte_range))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
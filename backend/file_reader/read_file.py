@@ -1,20 +1,30 @@
 import csv
 import io
+from typing import Iterator
 
-def read_csv(file) -> list[dict[str, str]]:
-    stream = io.StringIO(file.stream.read().decode("utf-8"))
-    reader = csv.DictReader(stream)
+def clean_row(row: dict) -> dict[str, str]:
+    return {
+        k: (v.strip() if v is not None else "")
+        for k, v in row.items()
+        if k is not None
+    }
 
-    if not reader.fieldnames:
-        raise ValueError("CSV hat keinen Header")
+def iter_csv(file, encoding: str = "utf-8-sig") -> Iterator[dict[str, str]]:
+    """Yield cleaned rows of an uploaded csv, the upload is decoded incrementally"""
+    # TextIOWrapper dekodiert blockweise, die Datei wird nie komplett in den Speicher gelesen
+    stream = io.TextIOWrapper(file.stream, encoding=encoding, newline="")
+    try:
+        reader = csv.DictReader(stream)
 
-    rows: list[dict[str, str]] = []
+        if not reader.fieldnames:
+            raise ValueError("CSV hat keinen Header")
+        reader.fieldnames = [name.strip() for name in reader.fieldnames]
 
-    for row in reader:
-        clean_row = {
-            k.strip(): (v.strip() if v is not None else "")
-            for k, v in row.items()
-        }
-        rows.append(clean_row)
+        for row in reader:
+            yield clean_row(row)
+    finally:
+        # der Upload-Stream gehört Flask und darf nicht mit dem Wrapper geschlossen werden
+        stream.detach()
 
-    return rows
+def read_csv(file) -> list[dict[str, str]]:
+    return list(iter_csv(file))
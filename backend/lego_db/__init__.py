@@ -1,4 +1,4 @@
-from backend.lego_db.interface_db import LegoDBInterface
+from backend.lego_db.interface_db import LegoDBInterface, SearchHit
 from backend.lego_db.lego_models import LegoPart, Weapon, WeaponSlot, TemplateMinifigure, ActualMinifigure, BasicModel, Color
 from backend.lego_db.db_converter.registry.tables import PRIMARY_KEY_NAME
 from backend.lego_db.db_converter.registry.relations import WEAPON_PART_TABLE
\ No newline at end of file
@@ -1 +1,6 @@
-from .repo_managers import ActualMinifigureRepoManager, TemplateMinifigureRepoManager, LegoPartRepoManager, WeaponRepoManager, WeaponSlotRepoManager, BaseRepoManager, ColorRepoManager
\ No newline at end of file
+from .repo_managers import ActualMinifigureRepoManager, TemplateMinifigureRepoManager, LegoPartRepoManager, WeaponRepoManager, WeaponSlotRepoManager, BaseRepoManager, ColorRepoManager
+from .generic_managers import ParentRef
+from .lazy_relations import LazyRelation, relation_ids
+from .converters import ModelConverter, get_converter
+from .identity_map import IdentityMap, identity_scope, current_identity_map
+from .model_cache import ModelCache, CacheStats, configure_model_cache, disable_model_cache, get_model_cache
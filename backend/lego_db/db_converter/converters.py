@@ -0,0 +1,98 @@
+from backend.lego_db.lego_models import BasicModel
+from backend.lego_db.db_converter.registry import RELATIONS, PRIMARY_KEY_NAME
+from backend.sql_api import Table
+from dataclasses import dataclass, fields
+from typing import Callable
+
+# wandelt gelesene Rows in Models und Models in Rows (Werte in der Reihenfolge von table.attributes)
+# beide Funktionen werden einmal pro Model Klasse aus den Feld-Metadaten generiert
+@dataclass(frozen=True)
+class ModelConverter:
+    model_cls: type[BasicModel]
+    table: Table
+    from_row: Callable[[tuple, dict], BasicModel]   # (row, related) -> Model, related wie in _load_related
+    to_row: Callable[[BasicModel], tuple]
+    source: str                                     # generierter Code, zum Debuggen
+
+_CONVERTERS: dict[type[BasicModel], ModelConverter] = {}
+
+def get_converter(model_cls: type[BasicModel], table: Table) -> ModelConverter:
+    """Converter of model_cls stored in table, generated on first use"""
+    converter = _CONVERTERS.get(model_cls)
+    if converter is None or converter.table is not table:
+        converter = _CONVERTERS[model_cls] = compile_converter(model_cls, table)
+    return converter
+
+def compile_converter(model_cls: type[BasicModel], table: Table) -> ModelConverter:
+    """
+    Generate from_row / to_row from the field metadata of model_cls:
+    related_field -> foreign key column (id of the model), map -> relation over a joint table,
+    set -> comma separated column, other fields -> column with the same name.
+    """
+    positions = {attr.name: i for i, attr in enumerate(table.attributes)}
+    if PRIMARY_KEY_NAME not in positions:
+        raise ValueError(f"Table '{table.name}' has no column '{PRIMARY_KEY_NAME}'")
+    # Tabelle des Models -> Spalte bzw. Relation, über die es erreicht wird
+    fk_columns = {attr.foreign_key[0]: attr.name for attr in table.attributes if attr.foreign_key}
+    relations = {
+        relation["child_table"].name: name
+        for name, relation in RELATIONS.items()
+        if relation["parent_table"].name == table.name
+    }
+
+    args: list[str] = []
+    column_values: dict[str, str] = {PRIMARY_KEY_NAME: "model.id"}
+    for f in fields(model_cls):
+        if f.name == PRIMARY_KEY_NAME:
+            continue
+        meta = f.metadata
+        if meta.get("map"):
+            relation = relations.get(meta["repo"])
+            if relation is None:
+                raise ValueError(f"No relation from '{table.name}' to '{meta['repo']}' for field '{f.name}'")
+            args.append(f"{f.name}=related[{relation!r}][row[{positions[PRIMARY_KEY_NAME]}]]")
+        elif meta.get("related_field"):
+            column = fk_columns.get(meta["repo"])
+            if column is None:
+                raise ValueError(f"No foreign key from '{table.name}' to '{meta['repo']}' for field '{f.name}'")
+            args.append(f"{f.name}=related[{column!r}].get(row[{positions[column]}])")
+            column_values[column] = f"_id(model.{f.name})"
+        elif f.name in positions:
+            if meta.get("set"):
+                args.append(f"{f.name}=_split(row[{positions[f.name]}])")
+                column_values[f.name] = f"_join(model.{f.name})"
+            else:
+                args.append(f"{f.name}=row[{positions[f.name]}]")
+                column_values[f.name] = f"model.{f.name}"
+        # Felder ohne Spalte behalten ihren Default
+
+    missing = [attr.name for attr in table.attributes if attr.name not in column_values]
+    if missing:
+        raise ValueError(f"{model_cls.__name__} has no field for the columns {missing} of '{table.name}'")
+
+    # gelesene Rows sind schon validiert: Model._from_db übernimmt die gespeicherte id
+    row_values = ", ".join(column_values[attr.name] for attr in table.attributes)
+    source = (
+        f"def from_row(row, related):\n"
+        f"    return _from_db(row[{positions[PRIMARY_KEY_NAME]}], {', '.join(args)})\n"
+        f"\n"
+        f"def to_row(model):\n"
+        f"    return ({row_values},)\n"
+    )
+    namespace = {
+        "_from_db": model_cls._from_db,
+        "_split": _split,
+        "_join": _join,
+        "_id": _id,
+    }
+    exec(compile(source, f"<converter {model_cls.__name__}>", "exec"), namespace)
+    return ModelConverter(model_cls, table, namespace["from_row"], namespace["to_row"], source)
+
+def _split(value: str | None) -> frozenset[str]:
+    return frozenset(value.split(",")) if value else frozenset()
+
+def _join(value) -> str:
+    return ",".join(sorted(value))
+
+def _id(model: BasicModel | None) -> str | None:
+    return None if model is None else model.id
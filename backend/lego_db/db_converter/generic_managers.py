@@ -1,40 +1,273 @@
 from backend.lego_db.lego_models import LegoPart, TemplateMinifigure, ActualMinifigure, Weapon, WeaponSlot, BasicModel
-from backend.sql_api import Table, Record, Element
-from backend.lego_db.db_converter.registry import RELATIONS, QUANTITY
-from backend.sql_api import DataBaseWrapper
-from typing import Mapping
+from backend.sql_api import Table, Record, Element, Row, Query, Attribute
+from backend.lego_db.db_converter.registry import RELATIONS, QUANTITY, SEARCH_COLUMNS, PRIMARY_KEY_NAME, TABLES_ALL
+from backend.lego_db.db_converter.identity_map import identity_scope, current_identity_map
+from backend.lego_db.db_converter.model_cache import ModelCache, get_model_cache
+from backend.lego_db.db_converter.lazy_relations import LazyRelation, RelationBatch
+from backend.lego_db.db_converter.converters import ModelConverter, get_converter
+from backend.sql_api import DataBaseWrapper, iter_chunks, DEFAULT_CHUNK_SIZE
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import Iterable, Iterator, Mapping
+
+# leichte Referenz auf ein Parent Model, das ein Child benutzt (ohne das Model zu laden)
+@dataclass(frozen=True)
+class ParentRef:
+    entity: str             # Tabelle / Manager des Parents
+    id: str
+    quantity: int | None    # None bei einer 1:1 Beziehung (Foreign Key)
+    label: str              # Suchspalten des Parents, z.B. Name
 
 # Klasse für Models ohne Child oder mit einer 1:1 Beziehung
 class BaseRepoManager:
     table: Table
     model_cls: type[BasicModel]
     joint_tables: list[Table]
+    # lazy geladene Models haben einen eigenen Bereich in der Identity Map, siehe ParentRepoManager
+    lazy: bool = False
 
     def __init__(self, db: DataBaseWrapper):
         self.db = db
+        # generierte Row <-> Model Funktionen, siehe converters.py
+        self.converter: ModelConverter = get_converter(self.model_cls, self.table)
 
     def get_model_ids(self) -> list[str]:
-        mids = []
-        models = self.get_models()
-        for model in models:
-            mids.append(model.id)
-        return mids
+        # nur die Rows lesen, ohne Models (und deren Relationen) zu bauen
+        return [row.pk for row in self.db.get_records(self.table)]
 
     # --- Write Models ---
     # Spaltet das Model in mehrere Reports welche dann in die Tabellen geschrieben werden
+    # alle Writes laufen in einer Transaktion, verschachtelte Manager werden zu Savepoints
     def add_model(self, model: BasicModel):
         record = self._record_from_model(model)
-        self.db.insert_record(self.table, record)
+        with self.db.transaction():
+            self.db.insert_record(self.table, record)
+        self._forget(model.id)
+
+    def add_models(
+            self,
+            models: Iterable[BasicModel],
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+            ignore_existing: bool = False
+    ) -> int:
+        """
+        Bulk insert: writes chunk_size models per executemany.
+        ignore_existing skips models that are already stored.
+        Returns the number of models written, skipped models are not counted.
+        """
+        count = 0
+        with self.db.transaction():
+            for chunk in iter_chunks(models, chunk_size):
+                # die Models sind bereits validiert, die Werte gehen ohne Record direkt an executemany
+                rows = [self.converter.to_row(model) for model in chunk]
+                count += self.db.insert_rows(self.table, rows, chunk_size, ignore_existing)
+                for model in chunk:
+                    self._forget(model.id)
+        return count
 
     def delete_model(self, model: BasicModel):
         record = self._record_from_model(model)
-        self.db.delete_record(self.table, record)
+        with self.db.transaction():
+            self.db.delete_record(self.table, record)
+        self._forget(model.id)
 
     # --- Read Models ---
     # Sammelt Models für eine Tabelle
-    def get_models(self) -> list[BasicModel]:
-        records = self.db.get_records(self.table)
-        return [self._model_from_record(record) for record in records]
+    def get_models(self, after: str = None, limit: int = None, before: str = None) -> list[BasicModel]:
+        """All models, or one page ordered by id (keyset pagination, see DataBaseWrapper.get_records)"""
+        if after is not None or before is not None or limit is not None:
+            with identity_scope():
+                records = self.db.get_records(self.table, after=after, limit=limit, before=before)
+                return self._models_from_records(records)
+
+        cache = self._model_cache()
+        with identity_scope() as identity_map:
+            # Version vor dem Lesen, damit ein Commit währenddessen den put verwirft
+            version = cache.sync() if cache else None
+            models = cache.get_table(self.table.name) if cache else None
+            if models is not None:
+                for model in models:
+                    identity_map.add(self.table.name, model.id, model)
+                return models
+
+            records = self.db.get_records(self.table)
+            models = self._models_from_records(records, version)
+            if cache:
+                cache.put_table(self.table.name, models, version)
+            return models
+
+    def iter_models(self, batch_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[BasicModel]:
+        """
+        Stream all models ordered by id: rows come from one cursor, related models are
+        loaded per batch and every batch gets its own identity map, so memory stays bounded.
+        """
+        for records in self.db.iter_records(self.table, batch_size):
+            # Models erst nach dem Scope ausgeben, der Scope darf nicht über ein yield hinweg offen bleiben
+            with identity_scope(fresh=True):
+                models = self._models_from_records(records)
+            yield from models
+
+    def query(self) -> Query:
+        """Start a Query on the table of this manager, e.g. mng.query().prefix("name", "Sw").order_by("name")"""
+        return Query(self.table)
+
+    def find_models(self, query: Query) -> list[BasicModel]:
+        """Models for all rows matching query (filtered, sorted and limited in SQL)"""
+        if query.table.name != self.table.name:
+            raise ValueError(f"Query for table '{query.table.name}' used on '{self.table.name}'")
+        with identity_scope():
+            records = self.db.run_query(query)
+            return self._models_from_records(records)
+
+    def search_prefix(self, text: str, limit: int = 20) -> list[dict[str, str]]:
+        """
+        Light rows (search columns only, no models) whose id or one of the
+        SEARCH_COLUMNS starts with text, case insensitive and served by an index.
+        """
+        columns = SEARCH_COLUMNS.get(self.table.name, [PRIMARY_KEY_NAME])
+        if not text:
+            queries = [self.query().limit(limit)]
+        else:
+            # erst Treffer in der ersten Suchspalte (id), dann in den weiteren, bis limit erreicht ist
+            # sortiert wie der NOCASE Index, der Index liefert also höchstens limit Zeilen ohne Sortierung
+            queries = [self.query().prefix(column, text).order_by(column, nocase=True).limit(limit) for column in columns]
+
+        rows: dict[str, dict[str, str]] = {}
+        for query in queries:
+            for record in self.db.run_query(query):
+                row = {column: record.get(column) for column in columns}
+                rows.setdefault(row[PRIMARY_KEY_NAME], row)
+            if len(rows) >= limit:
+                break
+        return list(rows.values())[:limit]
+
+    # --- Reverse Relations ---
+    def get_parents_of(self, child: BasicModel | str, relation_name: str) -> list[ParentRef]:
+        """Parents that contain child in the given relation, e.g. all weapons using a part"""
+        child_id = child if isinstance(child, str) else child.id
+        return self.get_parents_of_many([child_id], relation_name).get(child_id, [])
+
+    def get_parents_of_many(self, children: Iterable[BasicModel | str], relation_name: str) -> dict[str, list[ParentRef]]:
+        """Batch version of get_parents_of, one query for all children: {child_id: [ParentRef]}"""
+        relation = RELATIONS[relation_name]
+        if relation["child_table"].name != self.table.name:
+            raise ValueError(f"Relation '{relation_name}' has no child table '{self.table.name}'")
+
+        child_ids = [c if isinstance(c, str) else c.id for c in children]
+        parent_table: Table = relation["parent_table"]
+        results: dict[str, list[ParentRef]] = {child_id: [] for child_id in child_ids}
+        for joint_record, parent_record in self.db.get_parent_records(relation, child_ids):
+            child_id = joint_record.get(relation["child_column"])
+            quantity = joint_record.get(QUANTITY)
+            results[child_id].append(self._parent_ref(parent_table, parent_record, quantity))
+        return results
+
+    def get_used_in(self, children: Iterable[BasicModel | str]) -> dict[str, list[ParentRef]]:
+        """
+        All parents of the children over every relation plus every foreign key
+        pointing to this table (e.g. actual minifigures using a weapon slot).
+        One query per relation / foreign key.
+        """
+        child_ids = [c if isinstance(c, str) else c.id for c in children]
+        results: dict[str, list[ParentRef]] = {child_id: [] for child_id in child_ids}
+
+        relation_names, foreign_keys = self._parent_sources()
+        for relation_name in relation_names:
+            for child_id, refs in self.get_parents_of_many(child_ids, relation_name).items():
+                results[child_id].extend(refs)
+
+        for table, attr in foreign_keys:
+            for record in self.db.get_records_in(table, attr, child_ids):
+                child_id = record.get(attr.name)
+                results[child_id].append(self._parent_ref(table, record, None))
+        return results
+
+    def get_used_in_page(
+            self,
+            child: BasicModel | str,
+            limit: int,
+            source: str = None,
+            after: str = None
+    ) -> tuple[list[ParentRef], tuple[str, str | None] | None]:
+        """
+        One page of get_used_in for a single child, ordered by source (relation or
+        foreign key, see used_in_sources) and parent id. Returns the parents and the
+        (source, after) cursor of the next page, None on the last page.
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        child_id = child if isinstance(child, str) else child.id
+        sources = self.used_in_sources()
+        keys = list(sources)
+        if not keys:
+            return [], None
+        if source is None:
+            source = keys[0]
+        elif source not in sources:
+            raise ValueError(f"Unknown used in source '{source}' for '{self.table.name}'")
+
+        refs: list[ParentRef] = []
+        for key in keys[keys.index(source):]:
+            # eine Zeile mehr lesen, um zu wissen, ob es eine nächste Seite gibt
+            wanted = limit - len(refs) + 1
+            page = self._parents_from_source(sources[key], child_id, after if key == source else None, wanted)
+            if len(refs) + len(page) > limit:
+                taken = page[:limit - len(refs)]
+                # die nächste Seite beginnt in dieser Quelle, nach dem letzten gezeigten Parent oder am Anfang
+                return refs + taken, (key, taken[-1].id if taken else None)
+            refs += page
+        return refs, None
+
+    def used_in_sources(self) -> dict[str, str | tuple[Table, Attribute]]:
+        """Everything that can use models of this table: relation names and "table.column" foreign keys"""
+        relation_names, foreign_keys = self._parent_sources()
+        sources: dict[str, str | tuple[Table, Attribute]] = {name: name for name in relation_names}
+        sources.update((f"{table.name}.{attr.name}", (table, attr)) for table, attr in foreign_keys)
+        return sources
+
+    def _parents_from_source(
+            self,
+            source: str | tuple[Table, Attribute],
+            child_id: str,
+            after: str | None,
+            limit: int
+    ) -> list[ParentRef]:
+        if isinstance(source, str):
+            relation = RELATIONS[source]
+            return [
+                self._parent_ref(relation["parent_table"], parent_record, joint_record.get(QUANTITY))
+                for joint_record, parent_record in self.db.get_parent_records(relation, [child_id], after, limit)
+            ]
+        table, attr = source
+        query = Query(table).equals(attr, child_id).limit(limit)
+        if after is not None:
+            query = query.after(after)
+        return [self._parent_ref(table, record, None) for record in self.db.run_query(query)]
+
+    def has_parents(self) -> bool:
+        """True if models of this table can be used by other models"""
+        relation_names, foreign_keys = self._parent_sources()
+        return bool(relation_names or foreign_keys)
+
+    def _parent_sources(self) -> tuple[list[str], list[tuple[Table, Attribute]]]:
+        # Relationen mit dieser Tabelle als Child und Foreign Keys anderer Tabellen auf diese Tabelle
+        relation_names = [name for name, relation in RELATIONS.items() if relation["child_table"].name == self.table.name]
+        foreign_keys = [
+            (table, attr)
+            for table in TABLES_ALL for attr in table.attributes
+            if attr.foreign_key and attr.foreign_key[0] == self.table.name
+        ]
+        return relation_names, foreign_keys
+
+    def _parent_ref(self, table: Table, record: Row, quantity: int | None) -> ParentRef:
+        label_columns = [c for c in SEARCH_COLUMNS.get(table.name, []) if c != PRIMARY_KEY_NAME]
+        labels = [record.get(c) for c in label_columns]
+        return ParentRef(
+            entity=table.name,
+            id=record.pk,
+            quantity=quantity,
+            label=" · ".join(str(label) for label in labels if label)
+        )
 
     # --- Table Management ---
     def delete_tables(self):
@@ -46,32 +279,137 @@ class BaseRepoManager:
         self.db.create_table(self.table)
 
     # --- Helpers ---
-    def get_model_by_primary_key(self, pk_value: str) -> BasicModel:
-        models = self.get_models()
-        for model in models:
-            record = self._record_from_model(model)
-            pk_element = record.get_primary_key_element()
-            if pk_element.value == pk_value:
-                return model
+    def get_model_by_primary_key(self, pk_value: str) -> BasicModel | None:
+        return self.get_models_by_primary_keys([pk_value]).get(pk_value)
+
+    def get_models_by_primary_keys(self, pk_values: list[str]) -> dict[str, BasicModel]:
+        """Load the models for all given primary keys, returns {pk: model} (missing keys are skipped)"""
+        with identity_scope() as identity_map:
+            # bereits geladene Models aus Identity Map bzw. Cache, nur der Rest über den Primary Key Index
+            models = {}
+            for pk in pk_values:
+                model = identity_map.get(self.table.name, pk, self.lazy)
+                if model is not None:
+                    models[pk] = model
+
+            missing = [pk for pk in pk_values if pk not in models]
+            cache = self._model_cache() if missing else None
+            version = None
+            if cache:
+                # eine Versionsprüfung für den ganzen Batch, nicht pro Key
+                version = cache.sync()
+                for pk, model in cache.get_many(self.table.name, missing).items():
+                    identity_map.add(self.table.name, pk, model)
+                    models[pk] = model
+                missing = [pk for pk in missing if pk not in models]
+
+            if missing:
+                records = self.db.get_records_by_pks(self.table, missing)
+                loaded = self._models_from_records(records, version)
+                for record, model in zip(records, loaded):
+                    models[record.pk] = model
+
+            return {pk: models[pk] for pk in pk_values if pk in models}
             
     # --- Generic Conversion  ---
     # schreibt genau einen Record für eine Tabelle
     # row from Model
     def _record_from_model(self, model) -> Record:
-        elements = []
-        for attr in self.table.attributes:
-            value = getattr(model, attr.name)
-            elements.append(Element(attr, value))
-        return Record(elements=elements)
+        values = self.converter.to_row(model)
+        return Record(elements=[Element(attr, value) for attr, value in zip(self.table.attributes, values)])
 
     
+    # baut die Models für mehrere gelesene Rows, referenzierte Models werden einmal pro Batch geladen
+    # Records, deren Model schon in der Identity Map liegt, werden nicht neu gebaut
+    # cache_version: Stand von ModelCache.sync() vor dem Lesen, None = neue Models nicht cachen
+    def _models_from_records(self, records: list[Row], cache_version: int = None) -> list[BasicModel]:
+        with identity_scope() as identity_map:
+            name = self.table.name
+            pks = [r.pk for r in records]
+            new_records = [(r, pk) for r, pk in zip(records, pks) if identity_map.get(name, pk, self.lazy) is None]
+
+            if new_records:
+                related = self._load_related([r for r, _ in new_records])
+                built = {}
+                for record, pk in new_records:
+                    model = self._model_from_record(record, related)
+                    identity_map.add(name, pk, model, self.lazy)
+                    built[pk] = model
+                cache = self._model_cache() if cache_version is not None else None
+                if cache:
+                    cache.put_many(name, built, cache_version)
+
+            return [identity_map.get(name, pk, self.lazy) for pk in pks]
+
+    def _model_cache(self) -> ModelCache | None:
+        # innerhalb einer Transaktion gelesene Daten könnten noch zurückgerollt werden
+        if self.db.in_transaction():
+            return None
+        return get_model_cache(self.db)
+
+    def _forget(self, pk_value: str):
+        identity_map = current_identity_map()
+        if identity_map is not None:
+            identity_map.discard(self.table.name, pk_value)
+        cache = get_model_cache(self.db)
+        if cache:
+            cache.invalidate(self.table.name, pk_value)
+
+    def _load_related(self, records: list[Row]) -> dict:
+        """Override in subclass: load all models referenced by records in batched queries"""
+        return {}
+
     # sammelt Records aus Tabellen, um das Model wieder zu bauen
     # Model from row
-    def _model_from_record(self, record: Record) -> BasicModel:
-        raise NotImplementedError
+    def _model_from_record(self, record: Row, related: dict) -> BasicModel:
+        return self.converter.from_row(record, related)
 
 # Klasse für alle Models, welche eine N:M beziehung mit ihren Childs haben
 class ParentRepoManager(BaseRepoManager):
+    # relation_name -> RepoManager der Child Tabelle, wird in der Subklasse gesetzt
+    relation_managers: dict[str, BaseRepoManager]
+    # relation_name -> Mapping Feld im Model
+    relation_fields: dict[str, str]
+
+    def __init__(self, db: DataBaseWrapper, lazy: bool = False):
+        super().__init__(db)
+        # lazy: Relationen werden erst beim ersten Zugriff geladen (LazyRelation)
+        self.lazy = lazy
+
+    def _model_cache(self) -> ModelCache | None:
+        # Lazy Proxies halten Records und Closures ihres Batches, sie dürfen nicht über den
+        # prozessweiten Cache bei eager Managern derselben Tabelle landen
+        if self.lazy:
+            return None
+        return super()._model_cache()
+
+    def _load_related(self, records: list[Row]) -> dict[str, dict[str, Mapping[BasicModel, int]]]:
+        # eine Joint Table Query + ein Batch für die Childs pro Relation, unabhängig von der Anzahl Records
+        parent_ids = [r.pk for r in records]
+        if self.lazy:
+            return {
+                relation_name: self._lazy_relations(relation_name, child_manager, parent_ids)
+                for relation_name, child_manager in self.relation_managers.items()
+            }
+        return {
+            relation_name: self._load_related_models_batch(relation_name, child_manager, parent_ids)
+            for relation_name, child_manager in self.relation_managers.items()
+        }
+
+    def _lazy_relations(
+            self,
+            relation_name: str,
+            child_manager: BaseRepoManager,
+            parent_ids: list[str]
+    ) -> dict[str, LazyRelation]:
+        # alle Parents eines Batches teilen sich die Abfragen, egal welcher zuerst zugreift
+        batch = RelationBatch(
+            parent_ids,
+            load_ids=lambda ids: self._load_related_ids_batch(relation_name, ids),
+            load_models=lambda ids_by_parent: self._models_for_related_ids(child_manager, ids_by_parent)
+        )
+        return {parent_id: LazyRelation(batch, parent_id) for parent_id in parent_ids}
+
     def _load_related_models(
             self,
             relation_name: str,
@@ -85,8 +423,26 @@ class ParentRepoManager(BaseRepoManager):
             child_manager: BaseRepoManager                  RepoManager für die Child Tabelle
             parent_id: str                                  die ID (oft primary Key) vom Parent
         RETURNS:
-            frozenset mit Objekten vom Child, welche laud joint_table zu der parent_id gemappt wurden  
+            dict mit Objekten vom Child und deren Anzahl, welche laut joint_table zu der parent_id gemappt wurden
+        """
+        return self._load_related_models_batch(relation_name, child_manager, [parent_id])[parent_id]
+
+    def _load_related_models_batch(
+            self,
+            relation_name: str,
+            child_manager: BaseRepoManager,
+            parent_ids: list[str]
+    ) -> dict[str, Mapping[BasicModel, int]]:
+        """
+        Wie _load_related_models, aber für viele Parents auf einmal
+        RETURNS:
+            {parent_id: {child_model: quantity}} für jede parent_id
         """
+        ids_by_parent = self._load_related_ids_batch(relation_name, parent_ids)
+        return self._models_for_related_ids(child_manager, ids_by_parent)
+
+    def _load_related_ids_batch(self, relation_name: str, parent_ids: list[str]) -> dict[str, dict[str, int]]:
+        """{parent_id: {child_id: quantity}} aus der Joint Table, ohne die Childs zu laden"""
         relation = RELATIONS[relation_name]
 
         joint_table: Table = relation["joint_table"]
@@ -94,80 +450,91 @@ class ParentRepoManager(BaseRepoManager):
         joint_table_child_attribute_name: str = relation["child_column"]
 
         joint_table_parent_attribute = joint_table.get_attribute_by_name(joint_table_parent_attribute_name)
-        joint_table_child_attribute = joint_table.get_attribute_by_name(joint_table_child_attribute_name)
-        child_quantity_attribute = joint_table.get_attribute_by_name(QUANTITY)
 
-        # Alle records mit der parent_id in der entsprechenden Spalte
-        records = self.db.get_query_records(joint_table, joint_table_parent_attribute, parent_id)
+        # alle records der parent_ids in einer Query
+        records = self.db.get_records_in(joint_table, joint_table_parent_attribute, parent_ids)
 
-        results: dict[BasicModel, int] = {}
-        
-        # jetzt child_ids aus den records sammeln um Objekte zu rekonstruieren
+        results: dict[str, dict[str, int]] = {parent_id: {} for parent_id in parent_ids}
         for r in records:
-            child_id_element = r.get_element_by_attribute_name(joint_table_child_attribute_name)
-            child_id = child_id_element.value
-            
+            child_id = r.get(joint_table_child_attribute_name)
             if child_id is None:
-                raise ValueError(f"No value found for attribute '{joint_table_child_attribute.name}' in record {r}")
-            
-            child_model = child_manager.get_model_by_primary_key(child_id)
+                raise ValueError(f"No value found for attribute '{joint_table_child_attribute_name}' in record {r}")
 
-            if child_model is None:
-                raise ValueError(f"No model found in table '{child_manager.table.name}' with id '{child_id}'")
-            
-            quantity = r.get_element_by_attribute_name(child_quantity_attribute.name).value
+            parent_id = r.get(joint_table_parent_attribute_name)
+            quantity = r.get(QUANTITY)
+            results[parent_id][child_id] = quantity
+
+        return results
 
-            results[child_model] = quantity
+    def _models_for_related_ids(
+            self,
+            child_manager: BaseRepoManager,
+            ids_by_parent: dict[str, dict[str, int]]
+    ) -> dict[str, dict[BasicModel, int]]:
+        # jetzt alle child_ids sammeln und die Objekte in einem Batch rekonstruieren
+        child_ids = [child_id for ids in ids_by_parent.values() for child_id in ids]
+        children = child_manager.get_models_by_primary_keys(child_ids) if child_ids else {}
+
+        results: dict[str, dict[BasicModel, int]] = {}
+        for parent_id, ids in ids_by_parent.items():
+            results[parent_id] = {}
+            for child_id, quantity in ids.items():
+                child_model = children.get(child_id)
+                if child_model is None:
+                    raise ValueError(f"No model found in table '{child_manager.table.name}' with id '{child_id}'")
+                results[parent_id][child_model] = quantity
 
         return results
-    
+
     def add_model(self, model: BasicModel):
-        # 1. haupt record in seine Tabelle einfügen
-        super().add_model(model)
-        # 2. relations hinzufügen
-        self._persist_relations(model)
+        self.add_models([model])
 
-    def _persist_relations(self, model: BasicModel):
-        """Override in subclass as needed"""
-        # stellt die Brücke zwische add_model und add_relations
-        raise NotImplementedError
+    def add_models(
+            self,
+            models: Iterable[BasicModel],
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+            ignore_existing: bool = False
+    ) -> int:
+        count = 0
+        # der ganze Graph (Parents, Childs, Joint Tables) ist ein Commit
+        with self.db.transaction():
+            for chunk in iter_chunks(models, chunk_size):
+                # 1. haupt records in ihre Tabelle einfügen, gezählt werden nur die Parents
+                count += super().add_models(chunk, chunk_size, ignore_existing)
+                # 2. relations hinzufügen
+                for relation_name, field_name in self.relation_fields.items():
+                    self._add_relations(chunk, field_name, relation_name, chunk_size, ignore_existing)
+        return count
 
     def _add_relations(
-            self, 
-            child_models: Mapping[BasicModel, int],
-            child_manager: BaseRepoManager,
+            self,
+            parents: list[BasicModel],
+            field_name: str,
             relation_name: str,
-            parent_id: str
+            chunk_size: int,
+            ignore_existing: bool
     ):
-        # Fügt die Werte in die Joint Tables ein
+        # Fügt die Childs und die Werte der Joint Table für alle parents gebündelt ein
         relation = RELATIONS[relation_name]
         joint_table: Table = relation["joint_table"]
-        joint_table_parent_attribute_name: str = relation["parent_column"]
-        joint_table_child_attribute_name: str = relation["child_column"]
+        parent_attribute = joint_table.get_attribute_by_name(relation["parent_column"])
+        child_attribute = joint_table.get_attribute_by_name(relation["child_column"])
+        quantity_attribute = joint_table.get_attribute_by_name(QUANTITY)
+
+        # Werte in der Reihenfolge der Joint Table Spalten
+        order = [parent_attribute.name, child_attribute.name, quantity_attribute.name]
+        pick = itemgetter(*(order.index(attr.name) for attr in joint_table.attributes))
+
+        children: dict[str, BasicModel] = {}
+        joint_rows: list[tuple] = []
+        for parent in parents:
+            child_models: Mapping[BasicModel, int] = getattr(parent, field_name)
+            for model, quantity in child_models.items():
+                children[model.id] = model
+                joint_rows.append(pick((parent.id, model.id, quantity)))
+
+        # Childs können schon existieren (z.B. ein Teil in mehreren Waffen)
+        child_manager = self.relation_managers[relation_name]
+        child_manager.add_models(children.values(), chunk_size, ignore_existing=True)
 
-        for model, quantity in child_models.items():
-            # add child model in its own Table
-            child_manager.add_model(model)
-
-            # add relation to respective joint Table
-            joint_record = Record(
-                elements=[
-                    Element(
-                        attribute=joint_table.get_attribute_by_name(joint_table_parent_attribute_name),
-                        value=parent_id
-                    ),
-                    Element(
-                        attribute=joint_table.get_attribute_by_name(joint_table_child_attribute_name),
-                        value=model.id
-                    ),
-                    Element(
-                        attribute=joint_table.get_attribute_by_name(QUANTITY),
-                        value=quantity
-                    )
-                ]
-            )
-
-            self.db.insert_record(
-                table=joint_table,
-                record=joint_record
-            )
\ No newline at end of file
+        self.db.insert_rows(joint_table, joint_rows, chunk_size, ignore_existing)
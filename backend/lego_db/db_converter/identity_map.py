@@ -0,0 +1,51 @@
+from backend.lego_db.lego_models import BasicModel
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+# Unit of Work: jede Zeile (table, id) wird pro Scope genau einmal zu einem Model
+# lazy geladene Models (mit LazyRelation) liegen getrennt, eager Manager bekommen sie nie zurück
+class IdentityMap:
+
+    def __init__(self):
+        self._models: dict[tuple[str, str, bool], BasicModel] = {}
+
+    def get(self, table_name: str, pk_value: str, lazy: bool = False) -> BasicModel | None:
+        return self._models.get((table_name, pk_value, lazy))
+
+    def add(self, table_name: str, pk_value: str, model: BasicModel, lazy: bool = False):
+        self._models[(table_name, pk_value, lazy)] = model
+
+    def discard(self, table_name: str, pk_value: str):
+        """Forget the row in both namespaces"""
+        self._models.pop((table_name, pk_value, False), None)
+        self._models.pop((table_name, pk_value, True), None)
+
+    def clear(self):
+        self._models.clear()
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+_CURRENT: ContextVar[IdentityMap | None] = ContextVar("identity_map", default=None)
+
+def current_identity_map() -> IdentityMap | None:
+    return _CURRENT.get()
+
+@contextmanager
+def identity_scope(fresh: bool = False) -> Iterator[IdentityMap]:
+    """
+    Share one IdentityMap between all repo managers until the scope ends.
+    Nested scopes reuse the outer map, unless fresh is set (e.g. for one batch of a stream).
+    """
+    active = _CURRENT.get()
+    if active is not None and not fresh:
+        yield active
+        return
+
+    identity_map = IdentityMap()
+    token = _CURRENT.set(identity_map)
+    try:
+        yield identity_map
+    finally:
+        _CURRENT.reset(token)
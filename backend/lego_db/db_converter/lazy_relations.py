@@ -0,0 +1,69 @@
+from backend.lego_db.lego_models import BasicModel
+from collections.abc import Mapping
+from typing import Callable, Iterator
+
+class RelationBatch:
+    """
+    Loads one relation for all parents hydrated together, on first access of any of them.
+    Child ids come from the joint table alone; child models are only built when needed.
+    """
+
+    def __init__(
+            self,
+            parent_ids: list[str],
+            load_ids: Callable[[list[str]], dict[str, dict[str, int]]],
+            load_models: Callable[[dict[str, dict[str, int]]], dict[str, dict[BasicModel, int]]]
+    ):
+        self.parent_ids = parent_ids
+        self._load_ids = load_ids
+        self._load_models = load_models
+        self._ids: dict[str, dict[str, int]] | None = None
+        self._models: dict[str, dict[BasicModel, int]] | None = None
+
+    def child_ids(self, parent_id: str) -> dict[str, int]:
+        if self._ids is None:
+            self._ids = self._load_ids(self.parent_ids)
+        return self._ids[parent_id]
+
+    def models(self, parent_id: str) -> dict[BasicModel, int]:
+        if self._models is None:
+            if self._ids is None:
+                self._ids = self._load_ids(self.parent_ids)
+            self._models = self._load_models(self._ids)
+        return self._models[parent_id]
+
+class LazyRelation(Mapping):
+    """Read only child model -> quantity mapping of one parent, filled by its RelationBatch"""
+    __slots__ = ("_batch", "_parent_id")
+
+    def __init__(self, batch: RelationBatch, parent_id: str):
+        self._batch = batch
+        self._parent_id = parent_id
+
+    def child_ids(self) -> dict[str, int]:
+        """child id -> quantity without building the child models"""
+        return self._batch.child_ids(self._parent_id)
+
+    def __getitem__(self, key: BasicModel) -> int:
+        return self._batch.models(self._parent_id)[key]
+
+    def __iter__(self) -> Iterator[BasicModel]:
+        return iter(self._batch.models(self._parent_id))
+
+    def __len__(self) -> int:
+        return len(self.child_ids())
+
+    def __contains__(self, key) -> bool:
+        # unbekannte ids ohne die Models zu bauen ablehnen, sonst wie bei einem dict vergleichen
+        if not isinstance(key, BasicModel) or key.id not in self.child_ids():
+            return False
+        return key in self._batch.models(self._parent_id)
+
+    def __repr__(self) -> str:
+        return f"LazyRelation({self._parent_id!r}, children={len(self)})"
+
+def relation_ids(mapping: Mapping[BasicModel, int]) -> dict[str, int]:
+    """child id -> quantity of a relation field, lazy relations stay unloaded"""
+    if isinstance(mapping, LazyRelation):
+        return mapping.child_ids()
+    return {model.id: quantity for model, quantity in mapping.items()}
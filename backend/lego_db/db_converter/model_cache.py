@@ -0,0 +1,143 @@
+from backend.lego_db.lego_models import BasicModel
+from backend.sql_api import DataBaseWrapper
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+import threading
+from typing import Iterable, Mapping
+
+DEFAULT_CACHE_SIZE = 50000
+
+# Zähler des Caches, wird als Kopie herausgegeben
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    table_hits: int = 0
+    table_misses: int = 0
+    invalidations: int = 0
+    stale_puts: int = 0     # verworfene puts, weil seit dem Lesen committet wurde
+    size: int = 0
+
+class ModelCache:
+    """
+    Process wide LRU cache for hydrated models, keyed by (table, id), plus whole table results.
+
+    Call sync() once per batch of lookups: it checks PRAGMA data_version, drops everything
+    after a commit (also from other connections and processes) and returns the version.
+    Pass that version to the puts, so models read before a commit are never stored.
+    """
+
+    def __init__(self, db: DataBaseWrapper, max_size: int = DEFAULT_CACHE_SIZE):
+        self.db = db
+        self.max_size = max_size
+
+        self._lock = threading.RLock()
+        self._models: OrderedDict[tuple[str, str], BasicModel] = OrderedDict()
+        self._tables: dict[str, list[BasicModel]] = {}
+        self._data_version: int | None = None
+        self._stats = CacheStats()
+
+    def sync(self) -> int:
+        """Check the data version (one PRAGMA), clear the cache if it changed and return it"""
+        version = self.db.data_version()
+        with self._lock:
+            if version != self._data_version:
+                if self._data_version is not None:
+                    self.clear()
+                self._data_version = version
+        return version
+
+    # --- Single Models ---
+    def get(self, table_name: str, pk_value: str) -> BasicModel | None:
+        return self.get_many(table_name, [pk_value]).get(pk_value)
+
+    def get_many(self, table_name: str, pk_values: Iterable[str]) -> dict[str, BasicModel]:
+        """Cached models of pk_values as {pk: model}, without checking the data version"""
+        found = {}
+        with self._lock:
+            for pk in pk_values:
+                key = (table_name, pk)
+                model = self._models.get(key)
+                if model is None:
+                    self._stats.misses += 1
+                    continue
+                self._models.move_to_end(key)
+                self._stats.hits += 1
+                found[pk] = model
+        return found
+
+    def put(self, table_name: str, pk_value: str, model: BasicModel, version: int):
+        self.put_many(table_name, {pk_value: model}, version)
+
+    def put_many(self, table_name: str, models: Mapping[str, BasicModel], version: int):
+        """Store models read at data version (from sync()), dropped if a commit happened since"""
+        with self._lock:
+            if not self._is_current(version):
+                return
+            # ein Batch größer als der Cache würde nur alles verdrängen und selbst wieder verdrängt werden
+            if len(models) > self.max_size:
+                return
+            for pk, model in models.items():
+                self._models[(table_name, pk)] = model
+                self._models.move_to_end((table_name, pk))
+            while len(self._models) > self.max_size:
+                self._models.popitem(last=False)
+                self._stats.evictions += 1
+
+    # --- Whole Tables ---
+    def get_table(self, table_name: str) -> list[BasicModel] | None:
+        """Cached result of a whole table, without checking the data version"""
+        with self._lock:
+            models = self._tables.get(table_name)
+            if models is None:
+                self._stats.table_misses += 1
+                return None
+            self._stats.table_hits += 1
+            return list(models)
+
+    def put_table(self, table_name: str, models: list[BasicModel], version: int):
+        with self._lock:
+            if self._is_current(version):
+                self._tables[table_name] = list(models)
+
+    # --- Invalidation ---
+    def invalidate(self, table_name: str, pk_value: str = None):
+        """Drop one model (or nothing) plus the cached table result"""
+        with self._lock:
+            if pk_value is not None:
+                self._models.pop((table_name, pk_value), None)
+            self._tables.pop(table_name, None)
+            self._stats.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._tables.clear()
+            self._stats.invalidations += 1
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return replace(self._stats, size=len(self._models))
+
+    def _is_current(self, version: int) -> bool:
+        # ein anderer Thread hat inzwischen einen neueren Stand gesehen und den Cache geleert
+        if version != self._data_version:
+            self._stats.stale_puts += 1
+            return False
+        return True
+
+# ein Cache pro Datenbankdatei
+_CACHES: dict[str, ModelCache] = {}
+
+def configure_model_cache(db: DataBaseWrapper, max_size: int = DEFAULT_CACHE_SIZE) -> ModelCache:
+    """Enable the model cache for all repo managers working on db"""
+    cache = ModelCache(db, max_size)
+    _CACHES[db.db_name] = cache
+    return cache
+
+def disable_model_cache(db: DataBaseWrapper):
+    _CACHES.pop(db.db_name, None)
+
+def get_model_cache(db: DataBaseWrapper) -> ModelCache | None:
+    return _CACHES.get(db.db_name)
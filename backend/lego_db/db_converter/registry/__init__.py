@@ -4,4 +4,4 @@ from .relations import TEMPLATE_PARTS_JOINT, WEAPON_PARTS_JOINT, WEAPON_SLOT_WEA
 from .relations import TEMPLATE_MINIFIGURE_PART_TABLE, TEMPLATE_MINIFIGURE_WEAPON_SLOT_TABLE, WEAPON_SLOT_WEAPON_TABLE, WEAPON_PART_TABLE, COLOR_TABLE
 
 from .tables import LEGO_PART_TABLE, TEMPLATE_MINIFIGURE_TABLE, ACTUAL_MINIFIGURE_TABLE, WEAPON_SLOT_TABLE, WEAPON_TABLE
-from .tables import PRIMARY_KEY_NAME
\ No newline at end of file
+from .tables import PRIMARY_KEY_NAME, SEARCH_COLUMNS, TABLES_ALL
\ No newline at end of file
@@ -5,6 +5,7 @@ from backend.sql_api import Attribute, Table
 
 
 # joint tables to define a N:M mapping
+# der primary key (parent, child) deckt Abfragen nach dem parent ab, die child Spalte bekommt einen eigenen Index
 QUANTITY = "quantity"
 
 # Template -> Parts
@@ -12,7 +13,7 @@ TEMPLATE_MINIFIGURE_PART_TABLE = Table(
     name="template_minifigure_part",
     attributes=[
         Attribute(name=TEMPLATE_NAME, type="TEXT", primary_key=True, foreign_key=(TEMPLATE_MINIFIGURE_TABLE.name, PRIMARY_KEY_NAME)),
-        Attribute(name=PART_NAME, type="TEXT", primary_key=True, foreign_key=(LEGO_PART_TABLE.name, PRIMARY_KEY_NAME)),
+        Attribute(name=PART_NAME, type="TEXT", primary_key=True, foreign_key=(LEGO_PART_TABLE.name, PRIMARY_KEY_NAME), index=True),
         Attribute(name=QUANTITY, type="INTEGER")
     ],
     is_joint=True
@@ -23,7 +24,7 @@ TEMPLATE_MINIFIGURE_WEAPON_SLOT_TABLE = Table(
     name="template_minifigure_weapon_slot",
     attributes=[
         Attribute(name=TEMPLATE_NAME, type="TEXT", primary_key=True, foreign_key=(TEMPLATE_MINIFIGURE_TABLE.name, PRIMARY_KEY_NAME)),
-        Attribute(name=WEAPON_SLOT_NAME, type="TEXT", primary_key=True, foreign_key=(WEAPON_SLOT_TABLE.name, PRIMARY_KEY_NAME)),
+        Attribute(name=WEAPON_SLOT_NAME, type="TEXT", primary_key=True, foreign_key=(WEAPON_SLOT_TABLE.name, PRIMARY_KEY_NAME), index=True),
         Attribute(name=QUANTITY, type="INTEGER")
     ],
     is_joint=True
@@ -34,7 +35,7 @@ WEAPON_SLOT_WEAPON_TABLE = Table(
     name="weapon_slot_weapon",
     attributes=[
         Attribute(name=WEAPON_SLOT_NAME, type="TEXT", primary_key=True, foreign_key=(WEAPON_SLOT_TABLE.name, PRIMARY_KEY_NAME)),
-        Attribute(name=WEAPON_NAME, type="TEXT", primary_key=True, foreign_key=(WEAPON_TABLE.name, PRIMARY_KEY_NAME)),
+        Attribute(name=WEAPON_NAME, type="TEXT", primary_key=True, foreign_key=(WEAPON_TABLE.name, PRIMARY_KEY_NAME), index=True),
         Attribute(name=QUANTITY, type="INTEGER")
     ],
     is_joint=True
@@ -45,7 +46,7 @@ WEAPON_PART_TABLE = Table(
     name="weapon_part",
     attributes=[
         Attribute(name=WEAPON_NAME, type="TEXT", primary_key=True, foreign_key=(WEAPON_TABLE.name, PRIMARY_KEY_NAME)),
-        Attribute(name=PART_NAME, type="TEXT", primary_key=True, foreign_key=(LEGO_PART_TABLE.name, PRIMARY_KEY_NAME)),
+        Attribute(name=PART_NAME, type="TEXT", primary_key=True, foreign_key=(LEGO_PART_TABLE.name, PRIMARY_KEY_NAME), index=True),
         Attribute(name=QUANTITY, type="INTEGER")
     ],
     is_joint=True
@@ -1,5 +1,5 @@
 # Define attribute schemas for each table
-from backend.sql_api import Attribute
+from backend.sql_api import Attribute, Index
 
 PRIMARY_KEY_NAME = "id"
 
@@ -12,8 +12,8 @@ COLOR_NAME = "bricklink_color_id"
 
 COLOR_ATTRIBUTES = [
     Attribute(name=PRIMARY_KEY_NAME, type="TEXT", primary_key=True),
-    Attribute(name="bricklink_color_id", type="TEXT"),
-    Attribute(name="rebrickable_color_id", type="TEXT"),
+    Attribute(name="bricklink_color_id", type="TEXT", index=True),
+    Attribute(name="rebrickable_color_id", type="TEXT", index=True),
     Attribute(name="lego_color_id", type="TEXT"),
     Attribute(name="rgb_value", type="TEXT"),
     Attribute(name="name", type="TEXT")
@@ -22,7 +22,7 @@ COLOR_ATTRIBUTES = [
 LEGO_PART_ATTRIBUTES = [
     Attribute(name=PRIMARY_KEY_NAME, type="TEXT", primary_key=True),
     Attribute(name="bricklink_part_id", type="TEXT"),
-    Attribute(name=COLOR_NAME, type="TEXT", foreign_key=("colors", PRIMARY_KEY_NAME)),
+    Attribute(name=COLOR_NAME, type="TEXT", foreign_key=("colors", PRIMARY_KEY_NAME), index=True),
     Attribute(name="lego_element_id", type="TEXT"),
     Attribute(name="lego_design_id", type="TEXT"),
     Attribute(name="description", type="TEXT")
@@ -30,7 +30,7 @@ LEGO_PART_ATTRIBUTES = [
 
 TEMPLATE_MINIFIGURE_ATTRIBUTES = [
     Attribute(name=PRIMARY_KEY_NAME, type="TEXT", primary_key=True),
-    Attribute(name="color", type="TEXT", foreign_key=("colors", PRIMARY_KEY_NAME)),
+    Attribute(name="bricklink_fig_id", type="TEXT", index=True),
     Attribute(name="name", type="TEXT"),
     Attribute(name="year", type="TEXT"),
     Attribute(name="sets", type="TEXT"),
@@ -39,8 +39,8 @@ TEMPLATE_MINIFIGURE_ATTRIBUTES = [
 
 ACTUAL_MINIFIGURE_ATTRIBUTES = [
     Attribute(name=PRIMARY_KEY_NAME, type="TEXT", primary_key=True),
-    Attribute(name=TEMPLATE_NAME, type="TEXT", foreign_key=("template_minifigures", PRIMARY_KEY_NAME)),
-    Attribute(name=WEAPON_SLOT_NAME, type="TEXT", foreign_key=("weapon_slots", PRIMARY_KEY_NAME)),
+    Attribute(name=TEMPLATE_NAME, type="TEXT", foreign_key=("template_minifigures", PRIMARY_KEY_NAME), index=True),
+    Attribute(name=WEAPON_SLOT_NAME, type="TEXT", foreign_key=("weapon_slots", PRIMARY_KEY_NAME), index=True),
     Attribute(name="box_number", type="TEXT"),
     Attribute(name="position_in_box", type="TEXT"),
     Attribute(name="condition", type="TEXT")
@@ -59,40 +59,54 @@ WEAPON_SLOT_ATTRIBUTES = [
 # define each table
 from backend.sql_api import Table
 
+def search_indexes(*columns: str) -> list[Index]:
+    """NOCASE indexes for the prefix search (autocomplete) on the id and the given columns"""
+    return [Index([column], nocase=True) for column in (PRIMARY_KEY_NAME,) + columns]
+
 COLOR_TABLE = Table(
     name="colors",
     attributes=COLOR_ATTRIBUTES,
-    is_joint=False
+    is_joint=False,
+    fulltext=["name"],
+    indexes=search_indexes("bricklink_color_id", "name")
 )
 
 LEGO_PART_TABLE = Table(
     name="lego_parts",
     attributes=LEGO_PART_ATTRIBUTES,
-    is_joint=False
+    is_joint=False,
+    fulltext=["description"],
+    indexes=search_indexes("bricklink_part_id", "description")
 )
 
 TEMPLATE_MINIFIGURE_TABLE = Table(
     name="template_minifigures",
     attributes=TEMPLATE_MINIFIGURE_ATTRIBUTES,
-    is_joint=False
+    is_joint=False,
+    fulltext=["name", "description"],
+    indexes=search_indexes("bricklink_fig_id", "name")
 )
 
 ACTUAL_MINIFIGURE_TABLE = Table(
     name="actual_minifigures",
     attributes=ACTUAL_MINIFIGURE_ATTRIBUTES,
-    is_joint=False
+    is_joint=False,
+    indexes=search_indexes("box_number")
 )
 
 WEAPON_TABLE = Table(
     name="weapons",
     attributes=WEAPON_ATTRIBUTES,
-    is_joint=False
+    is_joint=False,
+    fulltext=["name", "description"],
+    indexes=search_indexes("name")
 )
 
 WEAPON_SLOT_TABLE = Table(
     name="weapon_slots",
     attributes=WEAPON_SLOT_ATTRIBUTES,
-    is_joint=False
+    is_joint=False,
+    indexes=search_indexes()
 )
 
 TABLES_ALL = [
@@ -102,4 +116,10 @@ TABLES_ALL = [
     WEAPON_SLOT_TABLE,
     WEAPON_TABLE,
     COLOR_TABLE
-]
\ No newline at end of file
+]
+
+# Spalten für die Präfix-Suche (Autocomplete): alle Spalten mit NOCASE Index, die id zuerst
+SEARCH_COLUMNS = {
+    table.name: [index.columns[0] for index in table.indexes if index.nocase]
+    for table in TABLES_ALL
+}
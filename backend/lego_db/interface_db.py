@@ -1,8 +1,18 @@
-from backend.sql_api import DataBaseWrapper
+from backend.sql_api import DataBaseWrapper, DEFAULT_CHUNK_SIZE
 from backend.lego_db.db_converter import WeaponRepoManager, WeaponSlotRepoManager, TemplateMinifigureRepoManager, LegoPartRepoManager, ActualMinifigureRepoManager, BaseRepoManager, ColorRepoManager
 from backend.lego_db.lego_models import BasicModel
-from backend.lego_db.db_converter.registry.relations import RELATIONS
+from backend.lego_db.db_converter.registry.relations import RELATIONS, TABLES_ALL
 from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+# ein Treffer der Volltextsuche, ohne das Model zu laden
+@dataclass
+class SearchHit:
+    entity: str
+    id: str
+    text: str       # Inhalt der durchsuchten Spalten
+    score: float    # bm25, kleiner ist besser, nur innerhalb einer Tabelle vergleichbar
+    rank: int       # Platz innerhalb der Treffer dieser Tabelle, 0 = bester
 
 class LegoDBInterface:
 
@@ -30,11 +40,68 @@ class LegoDBInterface:
         for manager in self.managers.values():
             manager.delete_tables()
 
+    def transaction(self):
+        """Group several manager writes into one commit, see DataBaseWrapper.transaction"""
+        return self.db.transaction()
+
     def get_models(self, mng_name: str) -> list[BasicModel]:
         return self.managers[mng_name].get_models()
+
+    def iter_models(self, mng_name: str, batch_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[BasicModel]:
+        """Generator over all models of mng_name with bounded memory, see BaseRepoManager.iter_models"""
+        return self.managers[mng_name].iter_models(batch_size)
     
-    def add_models(self, part: BasicModel, mng_name: str):
+    def add_model(self, part: BasicModel, mng_name: str):
         self.managers[mng_name].add_model(part)
 
+    def add_models(self, parts: Iterable[BasicModel], mng_name: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """Bulk insert, see BaseRepoManager.add_models"""
+        return self.managers[mng_name].add_models(parts, chunk_size)
+
     def delete_model(self, part: BasicModel, mng_name: str):
         self.managers[mng_name].delete_model(part)
+
+    # --- VERSIONS ---
+    def dependent_tables(self, mng_name: str) -> list[str]:
+        """Tables whose rows end up in the models of mng_name: own table, joint tables, children, foreign keys"""
+        tables = {table.name: table for table in TABLES_ALL}
+        tables.update((r["joint_table"].name, r["joint_table"]) for r in RELATIONS.values())
+
+        names: list[str] = []
+        pending = [self.managers[mng_name].table]
+        while pending:
+            table = pending.pop()
+            if table.name in names:
+                continue
+            names.append(table.name)
+            pending += [tables[attr.foreign_key[0]] for attr in table.attributes if attr.foreign_key]
+            pending += [r["joint_table"] for r in RELATIONS.values() if r["parent_table"].name == table.name]
+        return names
+
+    def version_tag(self, mng_name: str) -> str:
+        """Changes whenever a table behind mng_name was written, one small query (no models)"""
+        versions = self.db.table_versions(self.dependent_tables(mng_name))
+        return ".".join(str(version) for version in versions.values())
+
+    # --- SEARCH ---
+    def search(self, text: str, limit: int = 20, mng_names: Iterable[str] = None) -> list[SearchHit]:
+        """
+        Full text search over all tables with a FTS5 index (or only mng_names).
+        bm25 depends on the size of each index, so hits are ranked per table
+        and the tables are interleaved: every table's best hit, then every second best, ...
+        """
+        hits: list[SearchHit] = []
+        for name in mng_names or self.managers:
+            table = self.managers[name].table
+            for rank, (record, score) in enumerate(self.db.search_fulltext(table, text, limit)):
+                values = [record.get(column) for column in table.fulltext]
+                hits.append(SearchHit(
+                    entity=name,
+                    id=record.pk,
+                    text=" · ".join(value for value in values if value),
+                    score=score,
+                    rank=rank
+                ))
+        # stabil sortiert: bei gleichem Platz bleibt die Reihenfolge der Manager
+        hits.sort(key=lambda hit: hit.rank)
+        return hits[:limit]
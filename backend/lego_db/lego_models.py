@@ -2,8 +2,9 @@
 Dataclasses for Lego models."""
 
 from dataclasses import dataclass, field, fields, Field, MISSING
+from functools import cache
 import hashlib
-from typing import Mapping, Optional
+from typing import ClassVar, Mapping, Optional
 
 
 UNDEFINED = object()
@@ -12,6 +13,9 @@ UNDEFINED = object()
 class BasicModel:
     id: str = field(init=False, metadata={"super_id": True})
 
+    # Debug: _from_db prüft, ob die gespeicherte id zum Inhalt passt (lädt dabei lazy Relationen)
+    verify_db_ids: ClassVar[bool] = False
+
     def __post_init__(self):
         # Trim Strings + Requirements Check
         missing = []
@@ -41,6 +45,27 @@ class BasicModel:
         
         object.__setattr__(self, "id", self.compute_id())
 
+    @classmethod
+    def _from_db(cls, id: str, **values):
+        """
+        Trusted constructor for models read from the database: keeps the stored id and
+        skips the creation field checks and compute_id. User input goes through the normal constructor.
+        """
+        model = object.__new__(cls)
+        state = model.__dict__
+        for name, default, default_factory in _db_fields(cls):
+            value = values.get(name, default)
+            if value is None and default_factory is not MISSING:
+                value = default_factory()
+            state[name] = value
+        state["id"] = id
+
+        if cls.verify_db_ids:
+            computed = model.compute_id()
+            if computed != id:
+                raise ValueError(f"Stored id '{id}' of {cls.__name__} does not match its content ('{computed}')")
+        return model
+
     def compute_id(self) -> str:
         base = self.id_source()
         digest = hashlib.sha256(base.encode()).hexdigest()
@@ -57,6 +82,9 @@ class BasicModel:
             if f.metadata.get("id_field", False)
         ]
     
+    # die id wird einmal bei der Erstellung aus id_source berechnet (bzw. aus der Datenbank übernommen)
+    # gleiche Models haben dieselbe id, der Hash hängt also nicht von der Größe des Graphen ab
+    # Subklassen müssen __hash__ wieder setzen, @dataclass(frozen=True) würde sonst einen Hash über alle Felder erzeugen
     def __hash__(self):
         return hash(self.id)
     
@@ -76,6 +104,8 @@ class Color(BasicModel):
     def id_source(self):
         return f"{self.bricklink_color_id}"
 
+    __hash__ = BasicModel.__hash__
+
 # Lego Teil
 @dataclass(frozen=True)
 class LegoPart(BasicModel):
@@ -89,6 +119,8 @@ class LegoPart(BasicModel):
     def id_source(self) -> str:
         return f"{self.bricklink_part_id}_{self.bricklink_color.id}"
 
+    __hash__ = BasicModel.__hash__
+
 # Waffentypen für Minifiguren
 @dataclass(frozen=True)
 class Weapon(BasicModel):
@@ -104,13 +136,14 @@ class Weapon(BasicModel):
             base += f"_{part.id}x{count}"
         return base
     
-    def __hash__(self):
-        # hash based on name + sorted (LegoPart.id, count)
-        parts_tuple = tuple(sorted((p.id, c) for p, c in self.parts.items()))
-        return hash((self.name, parts_tuple))
+    # die id enthält name und parts
+    __hash__ = BasicModel.__hash__
 
     def __eq__(self, other):
-        return isinstance(other, Weapon) and self.name == other.name and self.parts == other.parts
+        if self is other:
+            return True
+        # unterschiedliche ids -> unterschiedlicher Inhalt, die parts müssen nicht verglichen werden
+        return isinstance(other, Weapon) and self.id == other.id and self.name == other.name and self.parts == other.parts
 
 # eine Waffenauswahl für Minifiguren
 @dataclass(frozen=True)
@@ -127,12 +160,13 @@ class WeaponSlot(BasicModel):
             base += f"_{weapon.id}x{count}"
         return base
     
-    def __hash__(self):
-        weapons_tuple = tuple(sorted((w.id, c) for w, c in self.weapons.items()))
-        return hash(weapons_tuple)
+    # die id enthält alle weapons
+    __hash__ = BasicModel.__hash__
 
     def __eq__(self, other):
-        return isinstance(other, WeaponSlot) and self.weapons == other.weapons
+        if self is other:
+            return True
+        return isinstance(other, WeaponSlot) and self.id == other.id and self.weapons == other.weapons
 
 # eine Lego Minifigur zusammengesetzt aus verschiedenen Teilen
 @dataclass(frozen=True)
@@ -149,14 +183,15 @@ class TemplateMinifigure(BasicModel):
     def id_source(self) -> str:
         return self.bricklink_fig_id
     
-    def __hash__(self):
-        parts_tuple = tuple(sorted((p.id, c) for p, c in self.parts.items()))
-        weapons_tuple = tuple(sorted((w.id, c) for w, c in self.possible_weapons.items()))
-        return hash((self.bricklink_fig_id, parts_tuple, weapons_tuple))
+    # gleiche Templates haben dieselbe bricklink_fig_id und damit dieselbe id
+    __hash__ = BasicModel.__hash__
 
     def __eq__(self, other):
+        if self is other:
+            return True
         return (
             isinstance(other, TemplateMinifigure) and
+            self.id == other.id and
             self.bricklink_fig_id == other.bricklink_fig_id and
             self.parts == other.parts and
             self.possible_weapons == other.possible_weapons
@@ -192,14 +227,25 @@ class ActualMinifigure(BasicModel):
         base = f"{self.box_number}_{self.position_in_box}"
         return base
     
-    def __hash__(self):
-        return hash((self.box_number, self.position_in_box, self.template, self.weapon_slot))
+    # gleiche Minifiguren liegen am selben Platz und haben damit dieselbe id
+    __hash__ = BasicModel.__hash__
 
     def __eq__(self, other):
+        if self is other:
+            return True
         return (
             isinstance(other, ActualMinifigure) and
+            self.id == other.id and
             self.box_number == other.box_number and
             self.position_in_box == other.position_in_box and
             self.template == other.template and
             self.weapon_slot == other.weapon_slot
-        )
\ No newline at end of file
+        )
+
+@cache
+def _db_fields(cls: type[BasicModel]) -> list[tuple[str, object, object]]:
+    # (name, default, default_factory) aller Felder außer id, einmal pro Klasse
+    return [
+        (f.name, None if f.default is MISSING else f.default, f.default_factory)
+        for f in fields(cls) if f.name != "id"
+    ]
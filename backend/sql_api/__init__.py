@@ -1,3 +1,6 @@
 # sql_api/__init__.py
-from .db import DataBaseWrapper
-from .models import Attribute, Table, Record, Element
\ No newline at end of file
+from .db import DataBaseWrapper, iter_chunks, DEFAULT_CHUNK_SIZE
+from .models import Attribute, Table, Record, Element, Index, Row
+from .connection import ConnectionPool, ConnectionSettings, PoolStats
+from .query import Query, Condition, Cursor
+from .statements import TableStatements
\ No newline at end of file
@@ -0,0 +1,186 @@
+import sqlite3
+import threading
+import time
+import weakref
+from dataclasses import dataclass, replace
+
+# Einstellungen, die auf jede neue Verbindung angewendet werden
+@dataclass
+class ConnectionSettings:
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    cache_size: int = -16000                # negativ = Größe in KiB
+    mmap_size: int = 64 * 1024 * 1024       # bytes, 0 schaltet mmap ab
+    busy_timeout: int = 5000                # ms
+    foreign_keys: bool = True
+    cached_statements: int = 256            # sqlite3 Statement Cache pro Verbindung (Standard 128)
+
+    max_connections: int = 8
+    acquire_timeout: float = 30.0           # s, wie lange auf eine freie Verbindung gewartet wird
+
+    def pragmas(self) -> list[str]:
+        return [
+            f"PRAGMA journal_mode = {self.journal_mode}",
+            f"PRAGMA synchronous = {self.synchronous}",
+            f"PRAGMA cache_size = {int(self.cache_size)}",
+            f"PRAGMA mmap_size = {int(self.mmap_size)}",
+            f"PRAGMA busy_timeout = {int(self.busy_timeout)}",
+            f"PRAGMA foreign_keys = {'ON' if self.foreign_keys else 'OFF'}",
+        ]
+
+# Zähler des Pools, wird als Kopie herausgegeben
+@dataclass
+class PoolStats:
+    opened: int = 0         # neu geöffnete Verbindungen
+    closed: int = 0         # geschlossene Verbindungen
+    hits: int = 0           # acquire ohne neue Verbindung (Thread-Verbindung oder freie Verbindung)
+    waits: int = 0          # acquire musste auf eine freie Verbindung warten
+    wait_time: float = 0.0  # gesamte Wartezeit in s
+    released: int = 0       # Verbindungen, die an den Pool zurückgegeben wurden
+    in_use: int = 0
+    idle: int = 0
+
+# hält die Verbindung eines Threads, gibt sie beim Ende des Threads zurück an den Pool
+class _ThreadLease:
+    def __init__(self, pool: "ConnectionPool", conn: sqlite3.Connection):
+        self.conn = conn
+        self.finalizer = weakref.finalize(self, pool._return, conn)
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections.
+
+    Each thread keeps the connection it acquired until it calls release()
+    (or the thread ends), so repeated calls in one request share one connection.
+    """
+
+    def __init__(self, path: str, settings: ConnectionSettings = None):
+        self.path = path
+        self.settings = settings or ConnectionSettings()
+
+        self._cond = threading.Condition()
+        self._idle: list[sqlite3.Connection] = []
+        self._total = 0
+        self._local = threading.local()
+        self._stats = PoolStats()
+        self._closed = False
+
+        # eigene Verbindung nur für PRAGMA data_version, damit Commits aller Pool-Verbindungen sichtbar sind
+        self._monitor: sqlite3.Connection | None = None
+        self._monitor_lock = threading.Lock()
+
+    def acquire(self) -> sqlite3.Connection:
+        self._check_open()
+        lease: _ThreadLease = getattr(self._local, "lease", None)
+        if lease is not None:
+            with self._cond:
+                self._stats.hits += 1
+            return lease.conn
+
+        conn = self._checkout()
+        self._local.lease = _ThreadLease(self, conn)
+        return conn
+
+    def release(self):
+        """Return the connection of the current thread to the pool."""
+        lease: _ThreadLease = getattr(self._local, "lease", None)
+        if lease is None:
+            return
+        self._local.lease = None
+        lease.finalizer()
+
+    def data_version(self) -> int:
+        """Changes whenever another connection (pooled or from another process) commits."""
+        with self._monitor_lock:
+            if self._monitor is None:
+                self._check_open()
+                self._monitor = self._open()
+            return self._monitor.execute("PRAGMA data_version").fetchone()[0]
+
+    def close(self):
+        """
+        Close all idle connections and stop handing out new ones.
+        Connections still leased by other threads are closed when they are released.
+        """
+        with self._cond:
+            self._closed = True
+        self.release()
+        with self._monitor_lock:
+            if self._monitor is not None:
+                self._monitor.close()
+                self._monitor = None
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._stats.closed += len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            conn.close()
+
+    def stats(self) -> PoolStats:
+        with self._cond:
+            return replace(self._stats, in_use=self._total - len(self._idle), idle=len(self._idle))
+
+    # --- Helpers ---
+    def _check_open(self):
+        if self._closed:
+            raise sqlite3.ProgrammingError(f"Connection pool of '{self.path}' is closed")
+
+    def _checkout(self) -> sqlite3.Connection:
+        with self._cond:
+            if not self._idle and self._total >= self.settings.max_connections:
+                self._stats.waits += 1
+                start = time.perf_counter()
+                ready = self._cond.wait_for(
+                    lambda: self._idle or self._total < self.settings.max_connections,
+                    timeout=self.settings.acquire_timeout
+                )
+                self._stats.wait_time += time.perf_counter() - start
+                if not ready:
+                    raise TimeoutError(f"No free connection to '{self.path}' after {self.settings.acquire_timeout}s")
+
+            if self._idle:
+                self._stats.hits += 1
+                return self._idle.pop()
+
+            # Platz reservieren, die Verbindung selbst wird außerhalb des Locks geöffnet
+            self._total += 1
+            self._stats.opened += 1
+
+        try:
+            return self._open()
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._stats.opened -= 1
+                self._cond.notify()
+            raise
+
+    def _return(self, conn: sqlite3.Connection):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._cond:
+            self._stats.released += 1
+            # nach close() kommt die Verbindung nicht mehr in den Pool zurück
+            closed = self._closed
+            if closed:
+                self._total -= 1
+                self._stats.closed += 1
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+        if closed:
+            conn.close()
+
+    def _open(self) -> sqlite3.Connection:
+        # isolation_level=None: keine impliziten Transaktionen, siehe DataBaseWrapper.transaction()
+        conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=self.settings.cached_statements
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in self.settings.pragmas():
+            conn.execute(pragma)
+        return conn
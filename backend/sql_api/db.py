@@ -1,14 +1,93 @@
+import json
 import sqlite3
-from .models import Table, Record, Element, Attribute
+import threading
+from contextlib import contextmanager
+from itertools import islice
+from typing import Iterable, Iterator
+from .models import Table, Record, Attribute, Index, Row
+from .connection import ConnectionPool, ConnectionSettings, PoolStats
+from .query import Query, Cursor
+from .statements import TableStatements
 
 DB_NAME = "database.db"
+# max. Anzahl Records, die für einen executemany Aufruf im Speicher gehalten werden
+DEFAULT_CHUNK_SIZE = 1000
+# Änderungszähler pro Tabelle, einmal pro schreibendem Aufruf von DataBaseWrapper erhöht
+VERSION_TABLE = "table_versions"
+
+def iter_chunks(items: Iterable, chunk_size: int) -> Iterator[list]:
+    """Split any iterable into lists of at most chunk_size items"""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    iterator = iter(items)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
 
 class DataBaseWrapper:
 
-    def __init__(self, db_name: str = DB_NAME):
+    def __init__(self, db_name: str = DB_NAME, settings: ConnectionSettings = None):
+        self.name = db_name
         self.db_name = f"./data/{db_name}"
+        self.settings = settings or ConnectionSettings()
+        self._pool = ConnectionPool(self.db_name, self.settings)
+        self._tx = threading.local()
+        # Table.name -> vorkompilierte Statements, siehe statements()
+        self._statements: dict[str, TableStatements] = {}
         self._connect()
 
+    # --- Connection Management ---
+    def release(self):
+        """Give the connection of the current thread back to the pool (e.g. on request teardown)."""
+        self._pool.release()
+
+    def close(self):
+        """Close all pooled connections."""
+        self._pool.close()
+
+    def pool_stats(self) -> PoolStats:
+        return self._pool.stats()
+
+    # --- Transactions ---
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run everything inside the block on one connection with a single commit.
+        Nested calls (also from DataBaseWrapper methods and repo managers) become savepoints,
+        so an inner failure can be caught without losing the outer work.
+        """
+        db = self._connect()
+        depth = getattr(self._tx, "depth", 0)
+
+        if depth == 0:
+            db.execute("BEGIN IMMEDIATE")
+        else:
+            db.execute(f"SAVEPOINT sp_{depth}")
+
+        self._tx.depth = depth + 1
+        try:
+            yield db
+        except BaseException:
+            self._tx.depth = depth
+            if depth == 0:
+                db.execute("ROLLBACK")
+            else:
+                db.execute(f"ROLLBACK TO sp_{depth}")
+                db.execute(f"RELEASE sp_{depth}")
+            raise
+        else:
+            self._tx.depth = depth
+            if depth == 0:
+                db.execute("COMMIT")
+            else:
+                db.execute(f"RELEASE sp_{depth}")
+
+    def in_transaction(self) -> bool:
+        return getattr(self._tx, "depth", 0) > 0
+
+    def data_version(self) -> int:
+        """Counter that changes whenever the database was changed by a commit."""
+        return self._pool.data_version()
+
     def create_relations_table(self, relation: dict):
         joint_table = relation["joint_table"]
         self.create_table(joint_table, relation["parent_column"])
@@ -39,83 +118,499 @@ class DataBaseWrapper:
         columns_sql = ",\n".join(columns + foreign_keys)
         sql = f"CREATE TABLE IF NOT EXISTS {table.name} (\n{columns_sql}\n);"
 
-        with self._connect() as db:
+        with self.transaction() as db:
             db.execute(sql)
-            db.commit()
+            self._add_missing_columns(db, table)
+            for index in table.get_indexes():
+                self._create_index(db, table, index)
+            if table.fulltext:
+                self._create_fulltext(db, table)
+            self._register_version(db, table)
+
+    def _add_missing_columns(self, db: sqlite3.Connection, table: Table):
+        # ältere Datenbanken: Spalten, die im Schema neu dazugekommen sind, nachziehen
+        existing = {row["name"] for row in db.execute(f"PRAGMA table_info({table.name})")}
+        for attr in table.attributes:
+            if attr.name in existing:
+                continue
+            col_def = f"{attr.name} {attr.type}"
+            if attr.foreign_key:
+                ref_table, ref_column = attr.foreign_key
+                col_def += f" REFERENCES {ref_table}({ref_column})"
+            db.execute(f"ALTER TABLE {table.name} ADD COLUMN {col_def}")
+
+    def _create_fulltext(self, db: sqlite3.Connection, table: Table):
+        # FTS5 Index mit der Tabelle als externem Inhalt (über rowid), Trigger halten ihn synchron
+        fts = self._fulltext_name(table)
+        columns = ", ".join(self._safe_identifier(name) for name in table.fulltext)
+        new_values = ", ".join(f"new.{name}" for name in table.fulltext)
+        old_values = ", ".join(f"old.{name}" for name in table.fulltext)
+        exists = db.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (fts,)).fetchone()
+
+        db.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"{columns}, content='{table.name}', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2')"
+        )
+        db.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table.name} BEGIN "
+            f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.rowid, {new_values}); END"
+        )
+        db.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table.name} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.rowid, {old_values}); END"
+        )
+        db.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table.name} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.rowid, {old_values}); "
+            f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.rowid, {new_values}); END"
+        )
+        # bestehende Zeilen einmalig indexieren
+        if not exists:
+            db.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    def _register_version(self, db: sqlite3.Connection, table: Table):
+        self._create_version_table(db)
+        db.execute(f"INSERT OR IGNORE INTO {VERSION_TABLE} (name, version) VALUES (?, 0)", (table.name,))
+        # ältere Datenbanken: Trigger pro Zeile machten Bulk Inserts mehrfach langsamer
+        for suffix in ("ai", "au", "ad"):
+            db.execute(f"DROP TRIGGER IF EXISTS {table.name}_version_{suffix}")
+
+    def _create_version_table(self, db: sqlite3.Connection):
+        db.execute(f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (name TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+
+    def _bump_version(self, db: sqlite3.Connection, table: Table, changed: int = 1):
+        # ein UPDATE pro schreibendem Aufruf statt pro Zeile, in derselben Transaktion wie der Write
+        if changed <= 0:
+            return
+        self._create_version_table(db)
+        db.execute(
+            f"INSERT INTO {VERSION_TABLE} (name, version) VALUES (?, 1) "
+            f"ON CONFLICT (name) DO UPDATE SET version = version + 1",
+            (table.name,)
+        )
+
+    def table_versions(self, table_names: Iterable[str]) -> dict[str, int]:
+        """
+        Change counter of every table, increased once by every write through a DataBaseWrapper
+        (writes with plain SQL are not counted). Cheap enough to check on every request
+        (e.g. for ETags); unknown tables are 0.
+        """
+        names = list(dict.fromkeys(table_names))
+        versions = dict.fromkeys(names, 0)
+        sql = f"SELECT name, version FROM {VERSION_TABLE} WHERE name IN (SELECT value FROM json_each(?))"
+        try:
+            versions.update(self._fetch(sql, (json.dumps(names),)))
+        except sqlite3.OperationalError:
+            # noch keine Tabelle mit create_table angelegt
+            pass
+        return versions
+
+    def rebuild_fulltext(self, table: Table):
+        """Re-index the whole table, needed after VACUUM (which may renumber rowids)"""
+        fts = self._fulltext_name(table)
+        with self.transaction() as db:
+            db.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    def create_index(self, table: Table, index: Index):
+        """Create an index that is not declared on the table, does nothing if it exists"""
+        with self.transaction() as db:
+            self._create_index(db, table, index)
+
+    def _create_index(self, db: sqlite3.Connection, table: Table, index: Index):
+        known = {attr.name for attr in table.attributes}
+        for name in index.columns:
+            if self._safe_identifier(name) not in known:
+                raise ValueError(f"Table '{table.name}' has no attribute '{name}'")
+        unique = "UNIQUE " if index.unique else ""
+        collate = " COLLATE NOCASE" if index.nocase else ""
+        columns_sql = ", ".join(f"{name}{collate}" for name in index.columns)
+        index_name = self._safe_identifier(index.get_name(table.name))
+        db.execute(f"CREATE {unique}INDEX IF NOT EXISTS {index_name} ON {table.name} ({columns_sql})")
 
     def delete_table(self, table: Table):
         sql = f"DROP TABLE IF EXISTS {table.name}"
-        with self._connect() as db:
-            db.execute("PRAGMA foreign_keys = OFF;")
-            db.execute(sql)
-            db.execute("PRAGMA foreign_keys = ON;")
-            db.commit()
+        # PRAGMA foreign_keys wirkt nur außerhalb einer Transaktion
+        db = self._connect()
+        db.execute("PRAGMA foreign_keys = OFF;")
+        try:
+            with self.transaction():
+                db.execute(sql)
+                if table.fulltext:
+                    db.execute(f"DROP TABLE IF EXISTS {self._fulltext_name(table)}")
+                # der Inhalt ist weg, die Version muss sich also ändern
+                self._bump_version(db, table)
+        finally:
+            if self._pool.settings.foreign_keys:
+                db.execute("PRAGMA foreign_keys = ON;")
+
+    def statements(self, table: Table) -> TableStatements:
+        """Precompiled statements of table, built on first use and reused afterwards"""
+        stmts = self._statements.get(table.name)
+        # eine andere Table mit gleichem Namen (z.B. geändertes Schema) ersetzt den Eintrag
+        if stmts is None or stmts.table is not table:
+            stmts = self._statements[table.name] = TableStatements.compile(table)
+        return stmts
 
     def insert_record(self, table: Table, record: Record):
-        columns = [e.attribute.name for e in record.elements]
-        params = {e.attribute.name: e.value for e in record.elements}
-
-        columns_sql = ", ".join(columns)
-        placeholders_sql = ", ".join([f":{c}" for c in columns])
-        sql = f"INSERT INTO {table.name} ({columns_sql}) VALUES ({placeholders_sql})"
-        with self._connect() as db:
-            db.execute(sql, params)
-            db.commit()
-            
+        sql = self.statements(table).insert_columns(tuple(e.attribute.name for e in record.elements))
+        with self.transaction() as db:
+            changed = db.execute(sql, tuple(e.value for e in record.elements)).rowcount
+            self._bump_version(db, table, changed)
+
+    def upsert_record(self, table: Table, record: Record):
+        """Insert the record or update all other columns of the row with the same primary key"""
+        stmts = self.statements(table)
+        if stmts.upsert is None:
+            raise ValueError(f"Table '{table.name}' has no primary key")
+        if tuple(e.attribute.name for e in record.elements) != stmts.columns:
+            raise ValueError(f"Upsert into '{table.name}' needs a value for every attribute")
+        with self.transaction() as db:
+            changed = db.execute(stmts.upsert, tuple(e.value for e in record.elements)).rowcount
+            self._bump_version(db, table, changed)
+
+    def insert_records(
+            self,
+            table: Table,
+            records: Iterable[Record],
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+            ignore_existing: bool = False
+    ) -> int:
+        """
+        Insert many Records with executemany in a single transaction.
+        All Records must have the same elements (in the same order).
+        ignore_existing skips rows whose primary key already exists (INSERT OR IGNORE).
+        Returns the number of rows written, skipped rows are not counted.
+        """
+        stmts = self.statements(table)
+        sql = None
+        count = 0
+
+        with self.transaction() as db:
+            for chunk in iter_chunks(records, chunk_size):
+                if sql is None:
+                    columns = tuple(e.attribute.name for e in chunk[0].elements)
+                    sql = stmts.insert_columns(columns, ignore_existing)
+
+                # rowcount von executemany: Summe der geschriebenen Zeilen, ohne Trigger und ignorierte Zeilen
+                count += db.executemany(sql, [tuple(e.value for e in r.elements) for r in chunk]).rowcount
+            self._bump_version(db, table, count)
+
+        return count
+
+    def insert_rows(
+            self,
+            table: Table,
+            rows: Iterable[tuple],
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+            ignore_existing: bool = False
+    ) -> int:
+        """
+        Like insert_records for plain value tuples in table.attributes order.
+        The values are not validated, e.g. rows converted from already validated models.
+        """
+        stmts = self.statements(table)
+        sql = stmts.insert_or_ignore if ignore_existing else stmts.insert
+        count = 0
+
+        with self.transaction() as db:
+            for chunk in iter_chunks(rows, chunk_size):
+                count += db.executemany(sql, chunk).rowcount
+            self._bump_version(db, table, count)
+
+        return count
+
     def delete_record(self, table: Table, record: Record):
         pk_element = record.get_primary_key_element()
+        stmts = self.statements(table)
+        if stmts.delete_by_pk is None:
+            raise ValueError(f"Table '{table.name}' has no single column primary key")
 
-        sql = f"DELETE FROM {table.name} WHERE {pk_element.attribute.name} = :{pk_element.attribute.name}"
-        params = {pk_element.attribute.name: pk_element.value}
-        with self._connect() as db:
-            db.execute(sql, params)
-            db.commit()
-
-    def get_records(self, table: Table) -> list[Record]:
-        sql = f"SELECT * FROM {table.name}"
-        with self._connect() as db:
-            cursor = db.execute(sql)
-            rows = cursor.fetchall()
-
-        records = []
-        for row in rows:
-            elements = []
-            for attr in table.attributes:
-                value = row[attr.name]
-                elements.append(Element(attribute=attr, value=value))
-            records.append(Record(elements=elements))
-
-        return records
+        with self.transaction() as db:
+            changed = db.execute(stmts.delete_by_pk, (pk_element.value,)).rowcount
+            self._bump_version(db, table, changed)
+
+    def get_records(self, table: Table, after: any = None, limit: int = None, before: any = None) -> list[Row]:
+        """
+        Return all Rows, or one page of them when after/before/limit is given.
+        Pages are ordered by the primary key and use keyset (seek) pagination:
+        after = last primary key of the previous page, before = first primary key of the next page.
+        """
+        if after is None and before is None and limit is None:
+            return self._fetch_rows(table, self.statements(table).select_all)
+
+        if after is not None and before is not None:
+            raise ValueError("Use either 'after' or 'before', not both")
+
+        query = Query(table).limit(limit)
+        if after is not None:
+            query = query.after(after)
+        elif before is not None:
+            query = query.before(before)
+        return self.run_query(query)
+
+    def iter_records(self, table: Table, batch_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[list[Row]]:
+        """
+        All Rows ordered by the primary key, fetched from one cursor in batches of batch_size,
+        so memory stays bounded for any table size. Consume it in the thread that started it.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        stmts = self.statements(table)
+        sql = stmts.select_all + (f" ORDER BY {stmts.pk_name}" if stmts.pk_name else "")
+
+        cursor = self._connect().cursor()
+        cursor.row_factory = None
+        row_type = table.row_type
+        try:
+            cursor.execute(sql)
+            while batch := cursor.fetchmany(batch_size):
+                yield list(map(row_type, batch))
+        finally:
+            cursor.close()
+
+    def run_query(self, query: Query) -> list[Row]:
+        """Run a Query (filters, ORDER BY, LIMIT/OFFSET, keyset) and return its Rows"""
+        sql, params, reverse = self._compile_query(query)
+
+        rows = self._fetch_rows(query.table, sql, params)
+        if reverse:
+            rows.reverse()
+        return rows
+
+    def search_fulltext(self, table: Table, text: str, limit: int = 20) -> list[tuple[Row, float]]:
+        """
+        Full text search over table.fulltext, best matches first.
+        Every word of text is matched as a prefix; returns (row, bm25 score), lower is better.
+        """
+        words = [word for word in text.split() if word]
+        if not table.fulltext or not words:
+            return []
+        # jedes Wort als Phrase quoten, damit FTS5 Syntax (AND, NEAR, ") im Suchtext keine Rolle spielt
+        match = " ".join('"' + word.replace('"', '""') + '"*' for word in words)
+        fts = self._fulltext_name(table)
+        sql = (
+            f"SELECT {self._columns_sql(table, table.name)}, {fts}.rank FROM {fts} "
+            f"JOIN {table.name} ON {table.name}.rowid = {fts}.rowid "
+            f"WHERE {fts} MATCH :match ORDER BY {fts}.rank LIMIT :limit"
+        )
+
+        row_type = table.row_type
+        return [(row_type(values[:-1]), values[-1]) for values in self._fetch(sql, {"match": match, "limit": limit})]
+
+    def get_record_by_pk(self, table: Table, pk_value: any) -> Row | None:
+        """Return the Row with the given primary key, looked up via the primary key index"""
+        stmts = self.statements(table)
+        if stmts.select_by_pk is None:
+            raise ValueError(f"Table '{table.name}' has no single column primary key")
+        rows = self._fetch_rows(table, stmts.select_by_pk, (pk_value,))
+        return rows[0] if rows else None
+
+    def get_records_by_pks(self, table: Table, pk_values: list) -> list[Row]:
+        """Return the Rows for all given primary keys (missing keys are skipped)"""
+        stmts = self.statements(table)
+        if stmts.pk_name is None:
+            raise ValueError(f"Table '{table.name}' has no single column primary key")
+        return self._fetch_rows_in(table, stmts.pk_name, pk_values)
+
+    def get_parent_records(
+            self,
+            relation: dict,
+            child_values: list,
+            after: any = None,
+            limit: int = None
+    ) -> list[tuple[Row, Row]]:
+        """
+        Reverse lookup of a relation: (joint row, parent row) for every joint row
+        whose child column is one of child_values. One query over the child column index.
+        Ordered by the parent primary key, after/limit return one page of it (keyset).
+        """
+        values = list(dict.fromkeys(child_values))
+        if not values:
+            return []
+        joint_table: Table = relation["joint_table"]
+        parent_table: Table = relation["parent_table"]
+        parent_pk = parent_table.get_primary_key_attribute().name
+        params = {"vals": json.dumps(values)}
+
+        page_sql = ""
+        if after is not None:
+            page_sql += f"AND p.{parent_pk} > :after "
+            params["after"] = after
+        limit_sql = ""
+        if limit is not None:
+            limit_sql = " LIMIT :limit"
+            params["limit"] = limit
+
+        sql = (
+            f"SELECT {self._columns_sql(joint_table, 'j')}, {self._columns_sql(parent_table, 'p')} "
+            f"FROM {joint_table.name} AS j "
+            f"JOIN {parent_table.name} AS p ON p.{parent_pk} = j.{relation['parent_column']} "
+            f"WHERE j.{relation['child_column']} IN (SELECT value FROM json_each(:vals)) {page_sql}"
+            f"ORDER BY p.{parent_pk}{limit_sql}"
+        )
+
+        # die Werte beider Tabellen stehen hintereinander im Ergebnis
+        split = len(joint_table.attributes)
+        joint_row, parent_row = joint_table.row_type, parent_table.row_type
+        return [
+            (joint_row(values[:split]), parent_row(values[split:]))
+            for values in self._fetch(sql, params)
+        ]
+
+    def get_records_in(self, table: Table, query_attribute: Attribute, query_values: list) -> list[Row]:
+        """Return all Rows whose query_attribute value is one of query_values"""
+        return self._fetch_rows_in(table, query_attribute.name, query_values)
     
-    def get_query_records(self, table: Table, query_attribute: Attribute, query_value: any) -> list[Record]:
-        """Return all Records, which have Element(attribute=query_attribute, value=query_value)"""
-        if query_attribute.name not in [attr.name for attr in table.attributes]:
-            raise ValueError(f"Table '{table.name}' has no attribute '{query_attribute.name}'")
-        
-        sql = f"SELECT * from {table.name} WHERE {query_attribute.name} = :val"
-        params = {"val": query_value}
-
-        with self._connect() as db:
-            cursor = db.execute(sql, params)
-            rows = cursor.fetchall()
-
-        records = []
-        for row in rows:
-            elements = []
-            for attr in table.attributes:
-                value = row[attr.name]
-                elements.append(Element(attribute=attr, value=value))
-            records.append(Record(elements=elements))
-
-        return records
+    def get_query_records(self, table: Table, query_attribute: Attribute, query_value: any) -> list[Row]:
+        """Return all Rows whose query_attribute value equals query_value"""
+        sql = self.statements(table).select_by_column(query_attribute.name)
+        return self._fetch_rows(table, sql, (query_value,))
+
+    def _fetch_rows_in(self, table: Table, column: str, query_values: list) -> list[Row]:
+        sql = self.statements(table).select_in_column(column)
+        values = list(dict.fromkeys(query_values))
+        if not values:
+            return []
+        # alle Werte als ein JSON Parameter -> eine Query, egal wie viele Werte
+        return self._fetch_rows(table, sql, (json.dumps(values),))
+
+    def _fetch(self, sql: str, params: dict | tuple = None) -> list[tuple]:
+        # Lesepfad ohne sqlite3.Row: einfache Tupel, die Spaltenpositionen kennt Table.row_type
+        cursor = self._connect().cursor()
+        cursor.row_factory = None
+        return cursor.execute(sql, params or ()).fetchall()
+
+    def _fetch_rows(self, table: Table, sql: str, params: dict | tuple = None) -> list[Row]:
+        return list(map(table.row_type, self._fetch(sql, params)))
+
+    def _columns_sql(self, table: Table, alias: str = None) -> str:
+        # Spalten explizit in der Reihenfolge von table.attributes,
+        # nachträglich hinzugefügte Spalten stehen in der Datenbank sonst am Ende
+        if not alias:
+            return self.statements(table).columns_sql
+        return ", ".join(f"{alias}.{name}" for name in self.statements(table).columns)
     
+    def _compile_query(self, query: Query) -> tuple[str, dict, bool]:
+        """Translate a Query into (sql, params, reverse); reverse=True if the rows must be reversed afterwards"""
+        table = query.table
+        table_name = self._safe_identifier(table.name)
+        where: list[str] = []
+        params: dict = {}
+
+        for i, condition in enumerate(query.conditions):
+            column = self._safe_identifier(condition.attribute.name)
+            key = f"p{i}"
+            if condition.operator == "IN":
+                where.append(f"{column} IN (SELECT value FROM json_each(:{key}))")
+                params[key] = json.dumps(list(condition.value))
+            elif condition.operator == "PREFIX":
+                escaped = str(condition.value).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                where.append(f"{column} LIKE :{key} ESCAPE '\\'")
+                params[key] = escaped + "%"
+            elif condition.operator == "BETWEEN":
+                where.append(f"{column} BETWEEN :{key}_low AND :{key}_high")
+                params[f"{key}_low"], params[f"{key}_high"] = condition.value
+            else:
+                where.append(f"{column} {condition.operator} :{key}")
+                params[key] = condition.value
+
+        keyset_key = query.after_key if query.after_key is not None else query.before_key
+        paged = keyset_key is not None or query.limit_value is not None or query.offset_value is not None
+        order_sql = ""
+        reverse = False
+
+        if query.order is not None or paged:
+            pk_name = self.statements(table).pk_name
+            if query.order is not None:
+                sort_attr, descending, nocase = query.order
+                sort_name = self._safe_identifier(sort_attr.name)
+            else:
+                sort_name, descending, nocase = pk_name, False, False
+
+            # "before" läuft rückwärts über den Index, die Zeilen werden danach wieder umgedreht
+            reverse = query.before_key is not None
+            direction = "DESC" if descending != reverse else "ASC"
+            # NOCASE Index: Einträge liegen nach (Wert NOCASE, rowid), Gleichstand also über rowid auflösen
+            sort_sql = f"{sort_name} COLLATE NOCASE" if nocase else sort_name
+            tie_name = "rowid" if nocase else pk_name
+
+            if keyset_key is not None:
+                if pk_name is None:
+                    raise ValueError(f"Table '{table.name}' has no single column primary key for keyset pagination")
+                compare = ">" if direction == "ASC" else "<"
+                if sort_sql == pk_name:
+                    where.append(f"{pk_name} {compare} :key")
+                else:
+                    where.append(self._seek_condition(table, sort_sql, tie_name, pk_name, compare, keyset_key, params))
+                params["key"] = keyset_key.key if isinstance(keyset_key, Cursor) else keyset_key
+
+            # SQLite sortiert NULL vor allen Werten, ORDER BY sort, pk entspricht also (sort IS NOT NULL, sort, pk)
+            # und kann trotzdem den Index der Sortierspalte nutzen
+            order_columns = [f"{sort_sql} {direction}"] if sort_name else []
+            if tie_name is not None and sort_sql != tie_name:
+                order_columns.append(f"{tie_name} {direction}")
+            if order_columns:
+                order_sql = " ORDER BY " + ", ".join(order_columns)
+
+        where_sql = " WHERE " + " AND ".join(where) if where else ""
+
+        limit_sql = ""
+        if query.limit_value is not None or query.offset_value is not None:
+            limit_sql = " LIMIT :limit"
+            params["limit"] = query.limit_value if query.limit_value is not None else -1
+            if query.offset_value is not None:
+                limit_sql += " OFFSET :offset"
+                params["offset"] = query.offset_value
+
+        sql = f"SELECT {self._columns_sql(table)} FROM {table_name}{where_sql}{order_sql}{limit_sql}"
+        return sql, params, reverse
+
+    def _seek_condition(
+            self,
+            table: Table,
+            sort_sql: str,
+            tie_name: str,
+            pk_name: str,
+            compare: str,
+            key: any,
+            params: dict
+    ) -> str:
+        """
+        Keyset condition for rows after (compare ">") or before ("<") key in ORDER BY sort_sql, tie_name.
+        A Cursor brings its own sort value, a plain primary key is looked up and must still exist.
+        A comparison with NULL is never true in SQL, so rows with a NULL sort value (sorted first) get their own terms.
+        """
+        if isinstance(key, Cursor) and (tie_name == pk_name or key.tie is not None):
+            sort_value = key.sort_value
+            params["tie"] = key.key if tie_name == pk_name else key.tie
+        else:
+            pk_value = key.key if isinstance(key, Cursor) else key
+            anchor = self._fetch(f"SELECT {sort_sql}, {tie_name} FROM {table.name} WHERE {pk_name} = ?", (pk_value,))
+            if not anchor:
+                # ohne Sortierwert ist die Position unbekannt, eine leere Seite wäre falsch
+                raise ValueError(f"Keyset row '{pk_value}' of table '{table.name}' does not exist, pass a Cursor with its sort value")
+            sort_value, params["tie"] = anchor[0]
+        if sort_value is None:
+            if compare == ">":
+                # nach einer NULL Zeile: restliche NULL Zeilen, dann alle Werte
+                return f"({sort_sql} IS NOT NULL OR {tie_name} > :tie)"
+            return f"({sort_sql} IS NULL AND {tie_name} < :tie)"
+
+        params["sort"] = sort_value
+        if compare == ">":
+            return f"({sort_sql}, {tie_name}) > (:sort, :tie)"
+        # rückwärts kommen nach den Werten noch alle NULL Zeilen
+        return f"(({sort_sql}, {tie_name}) < (:sort, :tie) OR {sort_sql} IS NULL)"
+
+    def _fulltext_name(self, table: Table) -> str:
+        return f"{table.name}_fts"
+
     def _safe_identifier(self, name: str) -> str:
         if not name.isidentifier():
             raise ValueError(f"Invalid identifier: {name}")
         return name
     
     def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_name)
-        conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA foreign_keys = ON")
-        return conn
+        # langlebige Verbindung des aktuellen Threads aus dem Pool (autocommit)
+        # Transaktionen laufen ausschließlich über transaction()
+        return self._pool.acquire()
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import cached_property
 
 # ein Attribut einer Tabelle
 @dataclass
@@ -7,6 +8,23 @@ class Attribute:
     type: str
     primary_key: bool = False
     foreign_key: tuple = None
+    index: bool = False         # eigener Index auf der Spalte
+    unique: bool = False        # eigener UNIQUE Index auf der Spalte
+
+# ein Index über eine oder mehrere Spalten einer Tabelle
+@dataclass
+class Index:
+    columns: list[str]
+    unique: bool = False
+    nocase: bool = False        # COLLATE NOCASE, damit LIKE Präfix-Abfragen den Index nutzen
+    name: str = None
+
+    def get_name(self, table_name: str) -> str:
+        if self.name:
+            return self.name
+        prefix = "uq" if self.unique else "idx"
+        suffix = "_nocase" if self.nocase else ""
+        return f"{prefix}_{table_name}_{'_'.join(self.columns)}{suffix}"
 
 # eine Tabelle in der Datenbank
 @dataclass
@@ -14,6 +32,28 @@ class Table:
     name: str
     attributes: list[Attribute]
     is_joint: bool
+    fulltext: list[str] = field(default_factory=list)     # Spalten im FTS5 Index {name}_fts
+    indexes: list[Index] = field(default_factory=list)    # zusätzliche (mehrspaltige) Indizes
+
+    def get_indexes(self) -> list[Index]:
+        """All declared indexes: Attribute.index / Attribute.unique plus Table.indexes"""
+        indexes = [
+            Index(columns=[attr.name], unique=attr.unique)
+            for attr in self.attributes if attr.index or attr.unique
+        ]
+        return indexes + list(self.indexes)
+
+    @cached_property
+    def row_type(self) -> type["Row"]:
+        """Row subclass of this table, the column positions are resolved once here"""
+        positions = {attr.name: i for i, attr in enumerate(self.attributes)}
+        pk_positions = [i for i, attr in enumerate(self.attributes) if attr.primary_key]
+        return type(f"{self.name}_row", (Row,), {
+            "__slots__": (),
+            "table": self,
+            "positions": positions,
+            "pk_position": pk_positions[0] if len(pk_positions) == 1 else None,
+        })
 
     def get_attribute_by_name(self, attribute_name: str) -> Attribute:
         attr = next(attr for attr in self.attributes if attr.name == attribute_name)
@@ -21,6 +61,12 @@ class Table:
             raise ValueError(f"Table '{self.name}' has no attribute '{attribute_name}'")
         return attr
 
+    def get_primary_key_attribute(self) -> Attribute:
+        pk_attrs = [attr for attr in self.attributes if attr.primary_key]
+        if len(pk_attrs) != 1:
+            raise ValueError(f"Table '{self.name}' has no single column primary key")
+        return pk_attrs[0]
+
 # ein Element eines Datensatzes, ordnet einem Wert ein Attribut zu
 # validiert den Wert entsprechend dem Attributtyp bei der Initialisierung
 @dataclass
@@ -67,3 +113,31 @@ class Record:
     def get_element_by_attribute_name(self, attribute_name: str) -> Element:
         element = next((e for e in self.elements if e.attribute.name == attribute_name), None)
         return element
+
+# eine gelesene Zeile: Tupel der Werte in der Reihenfolge von Table.attributes
+# die Werte kommen aus der Datenbank und werden nicht validiert, geschrieben wird weiter über Record
+class Row(tuple):
+    __slots__ = ()
+    # von Table.row_type pro Tabelle gesetzt
+    table: Table = None
+    positions: dict[str, int] = {}
+    pk_position: int | None = None
+
+    @property
+    def pk(self) -> any:
+        if self.pk_position is None:
+            raise ValueError(f"Table '{self.table.name}' has no single column primary key")
+        return self[self.pk_position]
+
+    def get(self, attribute_name: str) -> any:
+        position = self.positions.get(attribute_name)
+        if position is None:
+            raise ValueError(f"Table '{self.table.name}' has no attribute '{attribute_name}'")
+        return self[position]
+
+    def to_dict(self) -> dict[str, any]:
+        return dict(zip(self.positions, self))
+
+    def to_record(self) -> Record:
+        """Validated Record with the same values, e.g. to write the row back"""
+        return Record(elements=[Element(attribute=attr, value=value) for attr, value in zip(self.table.attributes, self)])
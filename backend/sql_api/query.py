@@ -0,0 +1,80 @@
+from dataclasses import dataclass, field, replace
+from .models import Table, Attribute
+
+# erlaubte Operatoren einer Bedingung
+OPERATORS = ("=", "!=", "<", "<=", ">", ">=", "IN", "PREFIX", "BETWEEN")
+
+# eine Bedingung "attribute operator value"
+@dataclass(frozen=True)
+class Condition:
+    attribute: Attribute
+    operator: str
+    value: any
+
+# Keyset Position: primary key der Zeile plus ihr Sortierwert (und rowid bei nocase)
+# die Seite geht damit auch weiter, wenn die Zeile inzwischen gelöscht wurde
+@dataclass(frozen=True)
+class Cursor:
+    key: any
+    sort_value: any = None
+    tie: any = None
+
+# Beschreibung einer SELECT Abfrage auf eine Tabelle, wird von DataBaseWrapper.run_query in SQL übersetzt
+# jede Methode gibt eine neue Query zurück, eine Basis-Query kann also weiterverwendet werden
+@dataclass(frozen=True)
+class Query:
+    table: Table
+    conditions: tuple[Condition, ...] = ()
+    order: tuple[Attribute, bool, bool] | None = None   # (attribute, descending, nocase)
+    limit_value: int | None = None
+    offset_value: int | None = None
+    after_key: any = None                           # keyset: primary key (oder Cursor) der letzten Zeile der vorherigen Seite
+    before_key: any = None                          # keyset: primary key (oder Cursor) der ersten Zeile der nächsten Seite
+
+    def where(self, attribute: Attribute | str, operator: str, value: any) -> "Query":
+        operator = operator.upper()
+        if operator not in OPERATORS:
+            raise ValueError(f"Unknown operator '{operator}'")
+        if operator == "IN":
+            value = tuple(value)
+        elif operator == "BETWEEN":
+            low, high = value
+            value = (low, high)
+        condition = Condition(self._attribute(attribute), operator, value)
+        return replace(self, conditions=self.conditions + (condition,))
+
+    def equals(self, attribute: Attribute | str, value: any) -> "Query":
+        return self.where(attribute, "=", value)
+
+    def is_in(self, attribute: Attribute | str, values) -> "Query":
+        return self.where(attribute, "IN", values)
+
+    def prefix(self, attribute: Attribute | str, value: str) -> "Query":
+        return self.where(attribute, "PREFIX", value)
+
+    def between(self, attribute: Attribute | str, low: any, high: any) -> "Query":
+        return self.where(attribute, "BETWEEN", (low, high))
+
+    def order_by(self, attribute: Attribute | str, descending: bool = False, nocase: bool = False) -> "Query":
+        """nocase sorts with COLLATE NOCASE, ties by rowid, so a NOCASE index delivers the rows in order"""
+        return replace(self, order=(self._attribute(attribute), descending, nocase))
+
+    def limit(self, limit: int | None) -> "Query":
+        return replace(self, limit_value=None if limit is None else int(limit))
+
+    def offset(self, offset: int | None) -> "Query":
+        return replace(self, offset_value=None if offset is None else int(offset))
+
+    def after(self, key: any) -> "Query":
+        """Rows after key; a plain primary key needs the row to still exist when sorted by another column"""
+        return replace(self, after_key=key, before_key=None)
+
+    def before(self, key: any) -> "Query":
+        return replace(self, before_key=key, after_key=None)
+
+    def _attribute(self, attribute: Attribute | str) -> Attribute:
+        name = attribute if isinstance(attribute, str) else attribute.name
+        for attr in self.table.attributes:
+            if attr.name == name:
+                return attr
+        raise ValueError(f"Table '{self.table.name}' has no attribute '{name}'")
@@ -0,0 +1,88 @@
+from dataclasses import dataclass, field
+from .models import Table
+
+# SQL Texte und Spalten einer Tabelle, werden einmal pro Table erzeugt und danach wiederverwendet
+# alle Statements nutzen "?" Parameter in der Reihenfolge von columns
+@dataclass
+class TableStatements:
+    table: Table
+    columns: tuple[str, ...]
+    column_set: frozenset[str]
+    columns_sql: str                # "a, b, c" in der Reihenfolge von table.attributes
+    pk_name: str | None             # None ohne einspaltigen Primary Key
+    insert: str
+    insert_or_ignore: str
+    upsert: str | None
+    delete_by_pk: str | None
+    select_all: str
+    select_by_pk: str | None
+    _by_column: dict[str, str] = field(default_factory=dict, repr=False)
+    _in_column: dict[str, str] = field(default_factory=dict, repr=False)
+    _inserts: dict[tuple, str] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def compile(cls, table: Table) -> "TableStatements":
+        columns = tuple(attr.name for attr in table.attributes)
+        pk_names = [attr.name for attr in table.attributes if attr.primary_key]
+        pk_name = pk_names[0] if len(pk_names) == 1 else None
+        columns_sql = ", ".join(columns)
+        placeholders = ", ".join("?" for _ in columns)
+        insert = f"INSERT INTO {table.name} ({columns_sql}) VALUES ({placeholders})"
+
+        upsert = None
+        if pk_names:
+            updates = ", ".join(f"{name} = excluded.{name}" for name in columns if name not in pk_names)
+            action = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+            upsert = f"{insert} ON CONFLICT ({', '.join(pk_names)}) {action}"
+
+        select_all = f"SELECT {columns_sql} FROM {table.name}"
+        return cls(
+            table=table,
+            columns=columns,
+            column_set=frozenset(columns),
+            columns_sql=columns_sql,
+            pk_name=pk_name,
+            insert=insert,
+            insert_or_ignore=insert.replace("INSERT", "INSERT OR IGNORE", 1),
+            upsert=upsert,
+            delete_by_pk=f"DELETE FROM {table.name} WHERE {pk_name} = ?" if pk_name else None,
+            select_all=select_all,
+            select_by_pk=f"{select_all} WHERE {pk_name} = ?" if pk_name else None,
+        )
+
+    def has_column(self, name: str) -> bool:
+        return name in self.column_set
+
+    def select_by_column(self, name: str) -> str:
+        """SELECT ... WHERE name = ?"""
+        sql = self._by_column.get(name)
+        if sql is None:
+            self._check_column(name)
+            sql = self._by_column[name] = f"{self.select_all} WHERE {name} = ?"
+        return sql
+
+    def select_in_column(self, name: str) -> str:
+        """SELECT ... WHERE name IN (json array as single parameter)"""
+        sql = self._in_column.get(name)
+        if sql is None:
+            self._check_column(name)
+            sql = self._in_column[name] = f"{self.select_all} WHERE {name} IN (SELECT value FROM json_each(?))"
+        return sql
+
+    def insert_columns(self, columns: tuple[str, ...], ignore_existing: bool = False) -> str:
+        """INSERT for a subset of the columns, e.g. Records without all elements"""
+        if columns == self.columns:
+            return self.insert_or_ignore if ignore_existing else self.insert
+        key = (columns, ignore_existing)
+        sql = self._inserts.get(key)
+        if sql is None:
+            for name in columns:
+                self._check_column(name)
+            verb = "INSERT OR IGNORE" if ignore_existing else "INSERT"
+            placeholders = ", ".join("?" for _ in columns)
+            sql = self._inserts[key] = f"{verb} INTO {self.table.name} ({', '.join(columns)}) VALUES ({placeholders})"
+        return sql
+
+    def _check_column(self, name: str):
+        if name not in self.column_set:
+            raise ValueError(f"Table '{self.table.name}' has no attribute '{name}'")
@@ -0,0 +1,74 @@
+"""
+Micro benchmarks for the hot paths, no database needed.
+Run with: python -m backend.test.benchmarks [rows]
+"""
+from backend.lego_db.lego_models import Color, LegoPart, Weapon, WeaponSlot, TemplateMinifigure, ActualMinifigure
+from backend.lego_db.db_converter.converters import get_converter
+from backend.lego_db.db_converter.registry import LEGO_PART_TABLE, COLOR_NAME, PRIMARY_KEY_NAME
+from backend.sql_api import Record, Element
+from typing import Callable
+import sys
+import time
+
+def measure(name: str, n: int, func: Callable[[], object]) -> float:
+    """Run func once and print the cost per row in µs"""
+    start = time.perf_counter()
+    func()
+    per_row = (time.perf_counter() - start) / n * 1e6
+    print(f"{name:<40} {per_row:8.2f} µs/row")
+    return per_row
+
+def bench_converters(n: int):
+    color = Color(bricklink_color_id="11", name="Black")
+    related = {COLOR_NAME: {color.id: color}}
+    parts = [LegoPart(bricklink_part_id=f"p{i}", bricklink_color=color, description=f"Part {i}") for i in range(n)]
+    converter = get_converter(LegoPart, LEGO_PART_TABLE)
+    rows = [LEGO_PART_TABLE.row_type(converter.to_row(part)) for part in parts]
+
+    # vorher: dict aus der Row, Keys umbenennen, Konstruktor mit **data
+    def from_dict():
+        for row in rows:
+            data = row.to_dict()
+            data["bricklink_color"] = related[COLOR_NAME].get(data.pop(COLOR_NAME))
+            data.pop(PRIMARY_KEY_NAME)
+            LegoPart(**data)
+
+    # vorher: ein validierter Record pro Model
+    def to_record():
+        for part in parts:
+            elements = []
+            for attr in LEGO_PART_TABLE.attributes:
+                value = part.bricklink_color.id if attr.name == COLOR_NAME else getattr(part, attr.name)
+                elements.append(Element(attribute=attr, value=value))
+            Record(elements=elements)
+
+    print(f"--- converters ({n} lego parts) ---")
+    measure("row -> model (dict)", n, from_dict)
+    measure("row -> model (generated)", n, lambda: [converter.from_row(row, related) for row in rows])
+    measure("model -> Record", n, to_record)
+    measure("model -> row (generated)", n, lambda: [converter.to_row(part) for part in parts])
+
+def bench_hashing(n: int):
+    """hash / dict lookups of minifigures whose graph grows from 1 to 1000 parts per weapon"""
+    color = Color(bricklink_color_id="11", name="Black")
+    print(f"--- hashing ({n} lookups per size) ---")
+    for size in (1, 10, 100, 1000):
+        parts = {LegoPart(bricklink_part_id=f"p{i}", bricklink_color=color): 1 for i in range(size)}
+        slot = WeaponSlot(weapons={Weapon(name="Sword", parts=parts): 1})
+        template = TemplateMinifigure(bricklink_fig_id="cas001", parts=parts, possible_weapons={slot: 1})
+        figure = ActualMinifigure(box_number="1", position_in_box="1", template=template, weapon_slot=slot)
+        index = {figure: 1, template: 2, slot: 3}
+
+        def lookups():
+            for _ in range(n):
+                index[figure]
+                index[template]
+                index[slot]
+        measure(f"3 dict lookups, {size} parts", n, lookups)
+
+BENCHMARKS = [bench_converters, bench_hashing]
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    for bench in BENCHMARKS:
+        bench(rows)
@@ -0,0 +1,14 @@
+import os
+import uuid
+import pytest
+from backend.sql_api import DataBaseWrapper
+
+@pytest.fixture
+def db():
+    # eigene Datenbank pro Test unter ./data, wird danach wieder entfernt
+    wrapper = DataBaseWrapper(f"pytest_{uuid.uuid4().hex}.db")
+    yield wrapper
+    wrapper.close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(wrapper.db_name + suffix):
+            os.remove(wrapper.db_name + suffix)
@@ -0,0 +1,101 @@
+import threading
+import sqlite3
+import pytest
+from backend.sql_api import DataBaseWrapper, ConnectionSettings, Table, Attribute, Record, Element
+
+USER_TABLE = Table(
+    name="users",
+    attributes=[
+        Attribute(name="id", type="TEXT", primary_key=True),
+        Attribute(name="name", type="TEXT")
+    ],
+    is_joint=False
+)
+
+def user(uid: str, name: str) -> Record:
+    return Record(elements=[
+        Element(attribute=USER_TABLE.attributes[0], value=uid),
+        Element(attribute=USER_TABLE.attributes[1], value=name)
+    ])
+
+def test_connection_is_reused(db: DataBaseWrapper):
+    db.create_table(USER_TABLE)
+    for i in range(50):
+        db.insert_record(USER_TABLE, user(f"u{i}", "Alice"))
+    assert len(db.get_records(USER_TABLE)) == 50
+
+    stats = db.pool_stats()
+    assert stats.opened == 1
+    assert stats.hits >= 50
+
+def test_pragmas_are_applied(db: DataBaseWrapper):
+    with db._connect() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+
+def test_release_returns_connection(db: DataBaseWrapper):
+    db.create_table(USER_TABLE)
+    db.release()
+    stats = db.pool_stats()
+    assert stats.in_use == 0 and stats.idle == 1
+
+    db.get_records(USER_TABLE)
+    assert db.pool_stats().opened == 1
+
+def test_pool_is_bounded(db: DataBaseWrapper):
+    small = DataBaseWrapper(db.db_name.removeprefix("./data/"), ConnectionSettings(max_connections=1))
+    small.create_table(USER_TABLE)
+    small.release()
+
+    def worker():
+        small.get_records(USER_TABLE)
+        small.release()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = small.pool_stats()
+    assert stats.opened == 1
+    assert stats.in_use == 0
+    assert stats.hits >= 4
+    small.close()
+
+def test_thread_end_returns_connection(db: DataBaseWrapper):
+    db.release()
+    t = threading.Thread(target=lambda: db.create_table(USER_TABLE))
+    t.start()
+    t.join()
+    assert db.pool_stats().in_use == 0
+
+def test_close_then_release_closes_leased_connection(db: DataBaseWrapper):
+    db.create_table(USER_TABLE)
+    db.release()
+    leased = []
+    acquired, closed = threading.Event(), threading.Event()
+
+    def worker():
+        leased.append(db._connect())
+        acquired.set()
+        closed.wait()
+        db.release()
+
+    t = threading.Thread(target=worker)
+    t.start()
+    acquired.wait()
+    db.close()
+    assert db.pool_stats().in_use == 1
+    closed.set()
+    t.join()
+
+    # die geliehene Verbindung wird beim Zurückgeben geschlossen statt wieder in den Pool gelegt
+    stats = db.pool_stats()
+    assert stats.in_use == 0 and stats.idle == 0
+    assert stats.closed == stats.opened
+    with pytest.raises(sqlite3.ProgrammingError):
+        leased[0].execute("SELECT 1")
+    with pytest.raises(sqlite3.ProgrammingError):
+        db.get_records(USER_TABLE)
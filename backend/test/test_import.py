@@ -0,0 +1,102 @@
+import io
+import pytest
+from werkzeug.datastructures import FileStorage
+from backend.lego_db import LegoDBInterface, LegoPart, Color
+from backend.file_reader.read_file import iter_csv
+from backend.file_reader.get_info import import_csv
+from backend.file_reader.converter.conversion_manager import LegoPartConversionManager
+from backend.file_reader.parallel_import import read_header, split_byte_ranges
+from backend.sql_api import DataBaseWrapper
+
+BLACK = Color(bricklink_color_id="11", name="Black", rebrickable_color_id="0")
+
+def upload(text: str) -> FileStorage:
+    return FileStorage(stream=io.BytesIO(text.encode("utf-8")), filename="upload.csv")
+
+def setup_colors(db: DataBaseWrapper) -> LegoDBInterface:
+    inter = LegoDBInterface(db)
+    inter.create_all_tables()
+    inter.managers["colors"].add_model(BLACK)
+    return inter
+
+def test_iter_csv_streams_clean_rows():
+    rows = iter_csv(upload("﻿ part_num , name \n 3001 , Brick 2 x 4 \n3002,\n"))
+    assert next(rows) == {"part_num": "3001", "name": "Brick 2 x 4"}
+    assert next(rows) == {"part_num": "3002", "name": ""}
+
+def test_import_csv_in_chunks(db: DataBaseWrapper):
+    inter = setup_colors(db)
+    lines = ["part_num,name,color_id"] + [f"p{i},Part {i},0" for i in range(25)] + ["bad,Bad Part,999", ",No Id,0"]
+
+    report = import_csv(upload("\n".join(lines)), "lego_parts", db, chunk_size=10)
+    assert report.rows == 27
+    assert report.imported == 25
+    assert report.failed == 2
+    assert "row 26" in report.errors[0]
+    assert report.rows_per_sec > 0
+
+    parts = inter.managers["lego_parts"].get_models()
+    assert len(parts) == 25
+    assert LegoPart(bricklink_part_id="p3", bricklink_color=BLACK).id in {p.id for p in parts}
+
+    # ein wiederholter Import überspringt vorhandene Teile
+    report = import_csv(upload("\n".join(lines)), "lego_parts", db, chunk_size=10)
+    assert (report.imported, report.skipped, report.failed) == (0, 25, 2)
+    assert "25 already existed" in report.summary()
+    assert len(inter.managers["lego_parts"].get_models()) == 25
+
+def test_bricklink_colors_are_coerced(db: DataBaseWrapper):
+    inter = setup_colors(db)
+    text = "Color ID,Color Name,RGB,Type\n5.0,Red,#c91a09,Solid\n86,Light Bluish Gray,nope,Solid\n"
+
+    report = import_csv(upload(text), "colors", db, source="bricklink")
+    assert (report.imported, report.failed) == (1, 1)
+    red = inter.managers["colors"].get_model_by_primary_key(Color(bricklink_color_id="5").id)
+    assert (red.name, red.rgb_value) == ("Red", "C91A09")
+
+def test_missing_required_column_aborts_import(db: DataBaseWrapper):
+    setup_colors(db)
+    with pytest.raises(ValueError, match="part_num"):
+        import_csv(upload("name,color_id\nBrick,0\n"), "lego_parts", db)
+
+def test_references_resolved_once_per_batch(db: DataBaseWrapper):
+    setup_colors(db)
+    mng = LegoPartConversionManager(db)
+    rows = [{"part_num": f"p{i}", "name": "", "color_id": "0"} for i in range(50)]
+
+    statements = []
+    conn = db._connect()
+    conn.set_trace_callback(statements.append)
+    try:
+        models, errors = mng.models_from_rows(rows)
+    finally:
+        conn.set_trace_callback(None)
+    assert len(models) == 50 and not errors
+    assert len([sql for sql in statements if "FROM colors" in sql]) == 1
+
+def test_parallel_import_matches_serial(db: DataBaseWrapper):
+    inter = setup_colors(db)
+    lines = ["part_num,name,color_id"] + [f"p{i},\"Part, {i}\",0" for i in range(200)] + ["bad,Bad Part,999"]
+    text = "\n".join(lines) + "\n"
+
+    serial = import_csv(upload(text), "lego_parts", db, chunk_size=50)
+    serial_parts = {(p.id, p.description) for p in inter.managers["lego_parts"].get_models()}
+    inter.managers["lego_parts"].delete_tables()
+    inter.managers["lego_parts"].create_tables()
+
+    parallel = import_csv(upload(text), "lego_parts", db, chunk_size=50, workers=2, chunk_bytes=500)
+    assert (parallel.rows, parallel.imported, parallel.failed) == (serial.rows, serial.imported, serial.failed)
+    assert parallel.errors == serial.errors
+    assert {(p.id, p.description) for p in inter.managers["lego_parts"].get_models()} == serial_parts
+
+def test_split_byte_ranges_ends_on_lines(tmp_path):
+    path = tmp_path / "parts.csv"
+    path.write_bytes(b"part_num\n" + b"".join(b"p%d\n" % i for i in range(100)))
+    header, start = read_header(str(path))
+    ranges = split_byte_ranges(str(path), start, chunk_bytes=37)
+
+    assert header == ["part_num"]
+    assert ranges[0][0] == start and ranges[-1][1] == path.stat().st_size
+    assert all(end == next_start for (_, end), (next_start, _) in zip(ranges, ranges[1:]))
+    data = path.read_bytes()
+    assert all(data[end - 1:end] == b"\n" for _, end in ranges)
@@ -0,0 +1,167 @@
+import pytest
+from backend.sql_api import DataBaseWrapper, Table, Attribute, Record, Element, Query, Row, Cursor
+
+FIG_TABLE = Table(
+    name="figures",
+    attributes=[
+        Attribute(name="id", type="TEXT", primary_key=True),
+        Attribute(name="name", type="TEXT"),
+        Attribute(name="year", type="INTEGER")
+    ],
+    is_joint=False
+)
+
+FIGURES = [
+    ("f1", "Knight", 1984),
+    ("f2", "King", 1984),
+    ("f3", "Skeleton", 1995),
+    ("f4", "Knight_2", 2000),
+    ("f5", "Wizard", 1993),
+    ("f6", "Kn%ght", 2010),
+]
+
+@pytest.fixture
+def figures(db: DataBaseWrapper) -> DataBaseWrapper:
+    db.create_table(FIG_TABLE)
+    db.insert_records(FIG_TABLE, [
+        Record(elements=[Element(attr, value) for attr, value in zip(FIG_TABLE.attributes, row)])
+        for row in FIGURES
+    ])
+    return db
+
+def ids(records: list[Row]) -> list[str]:
+    return [r.pk for r in records]
+
+def test_filters(figures: DataBaseWrapper):
+    q = Query(FIG_TABLE)
+    assert ids(figures.run_query(q.equals("year", 1984))) == ["f1", "f2"]
+    assert ids(figures.run_query(q.is_in("id", ["f3", "f5", "nope"]).order_by("id"))) == ["f3", "f5"]
+    assert ids(figures.run_query(q.between("year", 1990, 2000).order_by("year"))) == ["f5", "f3", "f4"]
+    assert ids(figures.run_query(q.where("year", ">=", 2000).where("name", "!=", "Knight_2"))) == ["f6"]
+
+def test_prefix_escapes_wildcards(figures: DataBaseWrapper):
+    q = Query(FIG_TABLE).order_by("id")
+    assert ids(figures.run_query(q.prefix("name", "Kni"))) == ["f1", "f4"]
+    assert ids(figures.run_query(q.prefix("name", "Kn%"))) == ["f6"]
+    assert ids(figures.run_query(q.prefix("name", "Knight_"))) == ["f4"]
+
+def test_order_limit_offset(figures: DataBaseWrapper):
+    q = Query(FIG_TABLE).order_by("name", descending=True)
+    assert ids(figures.run_query(q.limit(2))) == ["f5", "f3"]
+    assert ids(figures.run_query(q.limit(2).offset(2))) == ["f4", "f1"]
+
+def test_keyset_on_sorted_column(figures: DataBaseWrapper):
+    q = Query(FIG_TABLE).order_by("year").limit(2)
+    assert ids(figures.run_query(q)) == ["f1", "f2"]
+    assert ids(figures.run_query(q.after("f2"))) == ["f5", "f3"]
+    assert ids(figures.run_query(q.after("f3"))) == ["f4", "f6"]
+    assert ids(figures.run_query(q.before("f4"))) == ["f5", "f3"]
+
+def test_unknown_attribute_is_rejected():
+    with pytest.raises(ValueError):
+        Query(FIG_TABLE).equals("name; DROP TABLE figures", "x")
+    with pytest.raises(ValueError):
+        Query(FIG_TABLE).where("name", "LIKE", "x")
+
+def test_rows(figures: DataBaseWrapper):
+    # Spalte, die in der Datenbank vor den Schema-Spalten steht
+    figures._connect().execute("ALTER TABLE figures RENAME TO figures_old")
+    figures._connect().execute("CREATE TABLE figures (year INTEGER, id TEXT PRIMARY KEY, name TEXT)")
+    figures._connect().execute("INSERT INTO figures SELECT year, id, name FROM figures_old")
+
+    row = figures.get_record_by_pk(FIG_TABLE, "f3")
+    assert isinstance(row, Row)
+    assert tuple(row) == ("f3", "Skeleton", 1995)
+    assert row.pk == "f3" and row.get("year") == 1995
+    assert row.to_dict() == {"id": "f3", "name": "Skeleton", "year": 1995}
+    assert row.to_record().get_element_by_attribute_name("name").value == "Skeleton"
+    with pytest.raises(ValueError):
+        row.get("nope")
+
+def test_statements(figures: DataBaseWrapper):
+    stmts = figures.statements(FIG_TABLE)
+    assert figures.statements(FIG_TABLE) is stmts
+    assert stmts.select_by_column("year") is stmts.select_by_column("year")
+    with pytest.raises(ValueError):
+        stmts.select_by_column("nope")
+
+    figures.upsert_record(FIG_TABLE, Record(elements=[Element(attr, value) for attr, value in zip(FIG_TABLE.attributes, ("f1", "Knight", 1985))]))
+    assert ids(figures.get_query_records(FIG_TABLE, FIG_TABLE.attributes[2], 1985)) == ["f1"]
+
+    figures.delete_record(FIG_TABLE, figures.get_record_by_pk(FIG_TABLE, "f2").to_record())
+    assert figures.get_record_by_pk(FIG_TABLE, "f2") is None
+    assert len(figures.get_records(FIG_TABLE)) == len(FIGURES) - 1
+
+def test_keyset_with_null_sort_values(figures: DataBaseWrapper):
+    figures.insert_records(FIG_TABLE, [
+        Record(elements=[Element(attr, value) for attr, value in zip(FIG_TABLE.attributes, row)])
+        for row in [("f0", None, 1990), ("f7", None, 1991), ("f8", None, 1992)]
+    ])
+
+    def forward(query: Query) -> list[str]:
+        seen, page = [], figures.run_query(query)
+        while page:
+            seen += ids(page)
+            page = figures.run_query(query.after(page[-1].pk))
+        return seen
+
+    def backward(query: Query, last: str) -> list[str]:
+        # von der Zeile last aus rückwärts, jede Seite kommt in Sortierreihenfolge zurück
+        seen, page = [], figures.run_query(query.before(last))
+        while page:
+            seen = ids(page) + seen
+            page = figures.run_query(query.before(page[0].pk))
+        return seen
+
+    # NULL steht aufsteigend vorne, absteigend hinten
+    ascending = Query(FIG_TABLE).order_by("name").limit(2)
+    descending = Query(FIG_TABLE).order_by("name", descending=True).limit(2)
+    expected = ["f0", "f7", "f8", "f2", "f6", "f1", "f4", "f3", "f5"]
+    assert ids(figures.run_query(ascending.limit(None))) == expected
+
+    assert forward(ascending) == expected
+    assert forward(descending) == expected[::-1]
+    assert backward(ascending, "f5") == expected[:-1]
+    assert backward(descending, "f0") == expected[:0:-1]
+
+    # Cursor auf einer NULL Zeile
+    assert ids(figures.run_query(ascending.after("f7"))) == ["f8", "f2"]
+    assert ids(figures.run_query(ascending.before("f8"))) == ["f0", "f7"]
+    assert ids(figures.run_query(descending.after("f7"))) == ["f0"]
+    assert ids(figures.run_query(descending.before("f7"))) == ["f2", "f8"]
+
+def test_keyset_cursor_survives_a_deleted_row(figures: DataBaseWrapper):
+    q = Query(FIG_TABLE).order_by("year").limit(2)
+    figures.delete_record(FIG_TABLE, Record(elements=[Element(FIG_TABLE.attributes[0], "f2")]))
+    # die Zeile ist weg, ihr Cursor kennt die Position trotzdem
+    assert ids(figures.run_query(q.after(Cursor("f2", 1984)))) == ["f5", "f3"]
+    assert ids(figures.run_query(q.before(Cursor("f2", 1984)))) == ["f1"]
+    assert ids(figures.run_query(q.order_by("name").after(Cursor("f9", None)))) == ["f6", "f1"]
+    # ohne Sortierwert keine stille leere Seite
+    with pytest.raises(ValueError):
+        figures.run_query(q.after("f2"))
+    # nach primary key sortiert reicht der Schlüssel
+    assert ids(figures.run_query(Query(FIG_TABLE).limit(2).after("f2"))) == ["f3", "f4"]
+
+def test_keyset_on_nocase_order(figures: DataBaseWrapper):
+    figures._connect().execute("UPDATE figures SET name = lower(name) WHERE id IN ('f2', 'f5')")
+    q = Query(FIG_TABLE).order_by("name", nocase=True).limit(2)
+    assert ids(figures.run_query(q.limit(None))) == ["f2", "f6", "f1", "f4", "f3", "f5"]
+    assert ids(figures.run_query(q.after("f6"))) == ["f1", "f4"]
+    assert ids(figures.run_query(q.before("f3"))) == ["f1", "f4"]
+
+def test_table_version_changes_once_per_write(figures: DataBaseWrapper):
+    version = figures.table_versions(["figures"])["figures"]
+    rows = [(f"n{i}", "Knight", 2000 + i) for i in range(50)]
+    assert figures.insert_rows(FIG_TABLE, rows, chunk_size=10) == 50
+    assert figures.table_versions(["figures"])["figures"] == version + 1
+
+    # nichts geschrieben, nichts geändert
+    assert figures.insert_rows(FIG_TABLE, rows, ignore_existing=True) == 0
+    assert figures.table_versions(["figures", "unknown"]) == {"figures": version + 1, "unknown": 0}
+
+    # keine Trigger pro Zeile mehr, auch nicht aus älteren Datenbanken
+    triggers = figures._connect().execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'figures'"
+    ).fetchall()
+    assert triggers == []
@@ -0,0 +1,468 @@
+import pytest
+import sqlite3
+from backend.lego_db import LegoDBInterface, LegoPart, Weapon, WeaponSlot, TemplateMinifigure, ActualMinifigure, Color
+from backend.lego_db.db_converter import identity_scope, configure_model_cache, disable_model_cache, ModelCache, TemplateMinifigureRepoManager, LazyRelation, relation_ids, get_converter
+from backend.lego_db.db_converter.registry import TEMPLATE_MINIFIGURE_TABLE, LEGO_PART_TABLE, TEMPLATE_PARTS_JOINT, TEMPLATE_WEAPON_SLOTS_JOINT
+from backend.sql_api import DataBaseWrapper
+
+RED = Color(bricklink_color_id="5", name="Red")
+BLACK = Color(bricklink_color_id="11", name="Black")
+
+def seed(db: DataBaseWrapper, templates: int = 2) -> LegoDBInterface:
+    inter = LegoDBInterface(db)
+    inter.create_all_tables()
+
+    for color in (RED, BLACK):
+        inter.managers["colors"].add_model(color)
+
+    for i in range(templates):
+        blade = LegoPart(bricklink_part_id=f"blade{i}", bricklink_color=BLACK, description="Sword")
+        torso = LegoPart(bricklink_part_id=f"torso{i}", bricklink_color=RED, description="Torso")
+        sword = Weapon(name=f"Sword {i}", parts={blade: 1})
+        slot = WeaponSlot(weapons={sword: 1})
+        template = TemplateMinifigure(bricklink_fig_id=f"cas{i:03}", name="Knight", parts={torso: 1}, possible_weapons={slot: 1})
+
+        inter.managers["template_minifigures"].add_model(template)
+        inter.managers["actual_minifigures"].add_model(
+            ActualMinifigure(box_number="1", position_in_box=str(i), template=template, weapon_slot=slot)
+        )
+    return inter
+
+def count_queries(db: DataBaseWrapper, func) -> int:
+    statements = []
+    conn = db._connect()
+    conn.set_trace_callback(lambda sql: statements.append(sql) if sql.lstrip().upper().startswith("SELECT") else None)
+    try:
+        func()
+    finally:
+        conn.set_trace_callback(None)
+    return len(statements)
+
+def test_get_model_by_primary_key(db: DataBaseWrapper):
+    inter = seed(db)
+    parts = inter.managers["lego_parts"]
+    blade = LegoPart(bricklink_part_id="blade0", bricklink_color=BLACK)
+
+    loaded = parts.get_model_by_primary_key(blade.id)
+    assert loaded.id == blade.id
+    assert loaded.bricklink_color.name == "Black"
+    assert parts.get_model_by_primary_key("missing") is None
+
+def test_get_models_by_primary_keys(db: DataBaseWrapper):
+    inter = seed(db)
+    weapons = inter.managers["weapons"]
+    ids = [w.id for w in weapons.get_models()]
+
+    loaded = weapons.get_models_by_primary_keys(list(reversed(ids)) + ["missing"])
+    assert list(loaded) == list(reversed(ids))
+    assert {w.name for w in loaded.values()} == {"Sword 0", "Sword 1"}
+
+def test_graph_round_trip(db: DataBaseWrapper):
+    inter = seed(db, templates=1)
+    template = inter.get_models("template_minifigures")[0]
+    figure = inter.get_models("actual_minifigures")[0]
+
+    assert [p.bricklink_part_id for p in template.parts] == ["torso0"]
+    slot = next(iter(template.possible_weapons))
+    assert [w.name for w in slot.weapons] == ["Sword 0"]
+    assert figure.template == template
+    assert figure.weapon_slot == slot
+
+def test_relation_queries_do_not_scale_with_rows(db: DataBaseWrapper):
+    inter = seed(db, templates=6)
+    templates = inter.managers["template_minifigures"]
+    few = count_queries(db, lambda: templates.get_models_by_primary_keys([t.id for t in templates.get_models()[:1]]))
+    many = count_queries(db, lambda: templates.get_models_by_primary_keys([t.id for t in templates.get_models()]))
+    assert few == many
+    assert len(templates.get_models()) == 6
+
+def test_shared_children_are_hydrated_once(db: DataBaseWrapper):
+    inter = seed(db, templates=3)
+    with identity_scope():
+        parts = inter.get_models("lego_parts")
+        templates = inter.get_models("template_minifigures")
+        figures = inter.get_models("actual_minifigures")
+
+    by_id = {p.id: p for p in parts}
+    for template in templates:
+        for part in template.parts:
+            assert part is by_id[part.id]
+    for figure in figures:
+        assert any(figure.template is t for t in templates)
+        assert figure.weapon_slot in figure.template.possible_weapons
+        assert any(figure.weapon_slot is s for s in figure.template.possible_weapons)
+    assert len({id(p.bricklink_color) for p in parts}) == 2
+
+def test_model_cache(db: DataBaseWrapper):
+    inter = seed(db)
+    cache = configure_model_cache(db)
+    try:
+        first = inter.get_models("weapons")
+        second = inter.get_models("weapons")
+        assert [w.id for w in first] == [w.id for w in second]
+        assert all(a is b for a, b in zip(first, second))
+        assert cache.stats().table_hits == 1
+
+        # Schreiben über eine andere Verbindung (anderer Prozess) invalidiert über data_version
+        other = DataBaseWrapper(db.db_name.removeprefix("./data/"))
+        with other._connect() as conn:
+            conn.execute("DELETE FROM actual_minifigures")
+        other.close()
+
+        assert inter.get_models("actual_minifigures") == []
+        assert cache.stats().invalidations >= 1
+
+        # eigene Writes invalidieren ebenfalls
+        inter.managers["colors"].add_model(Color(bricklink_color_id="1", name="White"))
+        assert len(inter.get_models("colors")) == 3
+    finally:
+        disable_model_cache(db)
+
+def test_model_cache_evicts_oldest(db: DataBaseWrapper):
+    seed(db)
+    cache = ModelCache(db, max_size=2)
+    version = cache.sync()
+    for i in range(3):
+        cache.put("colors", str(i), RED, version)
+    assert cache.get("colors", "0") is None
+    assert cache.get("colors", "2") is RED
+    assert cache.stats().evictions == 1
+
+    # ein Batch größer als der Cache wird gar nicht erst aufgenommen
+    cache.put_many("colors", {str(i): RED for i in range(3, 6)}, version)
+    assert cache.get("colors", "2") is RED
+    assert cache.get("colors", "3") is None
+
+def test_model_cache_drops_stale_puts(db: DataBaseWrapper):
+    seed(db)
+    cache = ModelCache(db)
+    version = cache.sync()
+    # Commit zwischen dem Lesen und dem put
+    LegoDBInterface(db).managers["colors"].add_model(Color(bricklink_color_id="1", name="White"))
+    assert cache.sync() != version
+
+    cache.put("colors", RED.id, RED, version)
+    cache.put_table("colors", [RED], version)
+    assert cache.get("colors", RED.id) is None
+    assert cache.get_table("colors") is None
+    assert cache.stats().stale_puts == 2
+
+def test_model_cache_checks_version_once_per_batch(db: DataBaseWrapper):
+    inter = seed(db)
+    configure_model_cache(db)
+    try:
+        inter.get_models("template_minifigures")
+        pragmas = []
+        db._pool._monitor.set_trace_callback(pragmas.append)
+        # alle Childs kommen aus dem Cache, trotzdem nur eine Versionsprüfung pro Manager Batch
+        with identity_scope():
+            parts = inter.managers["lego_parts"].get_models_by_primary_keys(inter.managers["lego_parts"].get_model_ids())
+        assert len(parts) > 1
+        assert pragmas == ["PRAGMA data_version"]
+    finally:
+        disable_model_cache(db)
+
+def test_bulk_insert(db: DataBaseWrapper):
+    inter = seed(db, templates=0)
+    parts = [LegoPart(bricklink_part_id=f"p{i}", bricklink_color=RED) for i in range(25)]
+    assert inter.add_models(parts, "lego_parts", chunk_size=10) == 25
+    assert len(inter.get_models("lego_parts")) == 25
+
+    # Waffen teilen sich Teile, die schon existieren
+    weapons = [Weapon(name=f"W{i}", parts={parts[0]: 1, parts[i]: 2}) for i in range(1, 6)]
+    commits = []
+    conn = db._connect()
+    conn.set_trace_callback(lambda sql: commits.append(sql) if sql == "COMMIT" else None)
+    inter.add_models(weapons, "weapons")
+    conn.set_trace_callback(None)
+
+    loaded = {w.name: w for w in inter.get_models("weapons")}
+    assert loaded["W3"].parts == {parts[0]: 1, parts[3]: 2}
+    assert len(commits) <= 4
+
+def test_bulk_insert_rejects_duplicates(db: DataBaseWrapper):
+    inter = seed(db, templates=0)
+    part = LegoPart(bricklink_part_id="p1", bricklink_color=RED)
+    inter.add_model(part, "lego_parts")
+    with pytest.raises(sqlite3.IntegrityError):
+        inter.add_models([part], "lego_parts")
+
+def test_graph_write_is_one_commit(db: DataBaseWrapper):
+    inter = seed(db, templates=0)
+    parts = [LegoPart(bricklink_part_id=f"p{i}", bricklink_color=RED) for i in range(3)]
+    slot = WeaponSlot(weapons={Weapon(name="Axe", parts={parts[0]: 1}): 1})
+    template = TemplateMinifigure(bricklink_fig_id="cas100", parts={parts[1]: 1, parts[2]: 1}, possible_weapons={slot: 1})
+
+    statements = []
+    conn = db._connect()
+    conn.set_trace_callback(statements.append)
+    inter.add_model(template, "template_minifigures")
+    conn.set_trace_callback(None)
+
+    assert statements.count("COMMIT") == 1
+    assert inter.get_models("template_minifigures") == [template]
+
+def test_failed_graph_write_is_rolled_back(db: DataBaseWrapper):
+    inter = seed(db, templates=0)
+    unknown_color = Color(bricklink_color_id="999")
+    good = LegoPart(bricklink_part_id="good", bricklink_color=RED)
+    bad = LegoPart(bricklink_part_id="bad", bricklink_color=unknown_color)
+
+    with pytest.raises(sqlite3.IntegrityError):
+        inter.add_model(Weapon(name="Broken", parts={good: 1, bad: 1}), "weapons")
+
+    assert inter.get_models("weapons") == []
+    assert inter.get_models("lego_parts") == []
+
+def test_nested_transaction_uses_savepoint(db: DataBaseWrapper):
+    inter = seed(db, templates=0)
+    part = LegoPart(bricklink_part_id="p1", bricklink_color=RED)
+
+    with inter.transaction():
+        inter.add_model(part, "lego_parts")
+        with pytest.raises(sqlite3.IntegrityError):
+            inter.add_model(part, "lego_parts")
+        inter.add_model(Color(bricklink_color_id="1"), "colors")
+
+    assert [p.id for p in inter.get_models("lego_parts")] == [part.id]
+    assert len(inter.get_models("colors")) == 3
+
+def test_keyset_pagination(db: DataBaseWrapper):
+    inter = seed(db, templates=0)
+    inter.add_models([LegoPart(bricklink_part_id=f"p{i}", bricklink_color=RED) for i in range(7)], "lego_parts")
+    parts = inter.managers["lego_parts"]
+    all_ids = sorted(p.id for p in parts.get_models())
+
+    pages, after = [], None
+    while page := parts.get_models(after=after, limit=3):
+        pages.append([p.id for p in page])
+        after = page[-1].id
+    assert pages == [all_ids[0:3], all_ids[3:6], all_ids[6:7]]
+
+    back = parts.get_models(before=all_ids[6], limit=3)
+    assert [p.id for p in back] == all_ids[3:6]
+
+def test_search_prefix_returns_light_rows(db: DataBaseWrapper):
+    inter = seed(db, templates=3)
+    parts = inter.managers["lego_parts"]
+
+    rows = parts.search_prefix("BLA", limit=2)
+    assert len(rows) == 2
+    assert all(row["bricklink_part_id"].startswith("blade") for row in rows)
+    assert set(rows[0]) == {"id", "bricklink_part_id", "description"}
+
+    blade = LegoPart(bricklink_part_id="blade1", bricklink_color=BLACK)
+    assert parts.search_prefix(blade.id[:6])[0]["id"] == blade.id
+    assert len(parts.search_prefix("", limit=4)) == 4
+    assert parts.search_prefix("nothing") == []
+
+def test_search_prefix_is_served_in_index_order(db: DataBaseWrapper):
+    inter = seed(db, templates=1)
+    parts = inter.managers["lego_parts"]
+    descriptions = ["zap b", "Zap a", "ZAP C", "zany", "Zoo"]
+    inter.add_models(
+        [LegoPart(bricklink_part_id=f"s{i}", bricklink_color=RED, description=d) for i, d in enumerate(descriptions)],
+        "lego_parts"
+    )
+
+    # der NOCASE Index findet die Treffer und liefert sie schon sortiert, SQLite muss nichts nachsortieren
+    query = parts.query().prefix("description", "za").order_by("description", nocase=True).limit(3)
+    sql, params, _ = db._compile_query(query)
+    plan = str([tuple(row) for row in db._connect().execute(f"EXPLAIN QUERY PLAN {sql}", params)])
+    assert "idx_lego_parts_description_nocase" in plan
+    assert "TEMP B-TREE" not in plan
+
+    rows = parts.search_prefix("za", limit=3)
+    assert [row["description"] for row in rows] == ["zany", "Zap a", "zap b"]
+
+def test_fulltext_search_follows_writes(db: DataBaseWrapper):
+    inter = seed(db, templates=2)
+    hits = inter.search("swo")
+    assert {hit.entity for hit in hits} == {"lego_parts", "weapons"}
+    assert all("Sword" in hit.text for hit in hits)
+    assert inter.search("knight torso", mng_names=["template_minifigures"]) == []
+
+    spare = Weapon(name="Sword Spare", description="Rusty", parts={LegoPart(bricklink_part_id="spare", bricklink_color=BLACK): 1})
+    inter.managers["weapons"].add_model(spare)
+    assert [hit.text for hit in inter.search("rust")] == ["Sword Spare · Rusty"]
+    inter.managers["weapons"].delete_model(spare)
+    assert inter.search("rust") == []
+    assert inter.search('"AND (') == []
+
+def test_fulltext_search_interleaves_tables(db: DataBaseWrapper):
+    inter = seed(db, templates=2)
+    blade = LegoPart(bricklink_part_id="blade0", bricklink_color=BLACK, description="Sword")
+    inter.add_models([Weapon(name=f"Sword Extra {i}", parts={blade: 1}) for i in range(10)], "weapons")
+
+    # bm25 verschiedener Tabellen ist nicht vergleichbar: Platz pro Tabelle, dann abwechselnd
+    hits = inter.search("swo", limit=4)
+    assert [(hit.entity, hit.rank) for hit in hits] == [
+        ("weapons", 0), ("lego_parts", 0), ("weapons", 1), ("lego_parts", 1)
+    ]
+    weapon_hits = [hit for hit in inter.search("swo", mng_names=["weapons"]) if hit.entity == "weapons"]
+    assert [hit.score for hit in weapon_hits] == sorted(hit.score for hit in weapon_hits)
+
+def test_declared_indexes_are_created_once(db: DataBaseWrapper):
+    inter = seed(db, templates=1)
+    inter.create_all_tables()
+    conn = db._connect()
+
+    def index_names(table: str) -> set[str]:
+        return {row["name"] for row in conn.execute(f"PRAGMA index_list({table})")}
+
+    assert "idx_lego_parts_bricklink_color_id" in index_names("lego_parts")
+    assert "idx_weapon_part_part_id" in index_names("weapon_part")
+    assert "idx_colors_bricklink_color_id" in index_names("colors")
+    # nur Indexe für die Abfragen, keine neuen Constraints, die bestehende Datenbanken verletzen könnten
+    assert not any(name.startswith("uq_") for table in ("colors", "template_minifigures", "actual_minifigures") for name in index_names(table))
+
+    plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM template_minifigure_part WHERE part_id = 'x'").fetchall()
+    assert "idx_template_minifigure_part_part_id" in str([tuple(row) for row in plan])
+
+def test_get_parents_of_part(db: DataBaseWrapper):
+    inter = seed(db, templates=2)
+    parts = inter.managers["lego_parts"]
+    blade = LegoPart(bricklink_part_id="blade0", bricklink_color=BLACK)
+    torso = LegoPart(bricklink_part_id="torso1", bricklink_color=RED)
+
+    refs = parts.get_parents_of(blade, "weapon_parts")
+    assert [(r.entity, r.label, r.quantity) for r in refs] == [("weapons", "Sword 0", 1)]
+    assert parts.get_parents_of(blade, "template_parts") == []
+
+    batch = parts.get_parents_of_many([blade.id, torso.id, "missing"], "template_parts")
+    assert batch[blade.id] == [] and batch["missing"] == []
+    assert [r.entity for r in batch[torso.id]] == ["template_minifigures"]
+
+    with pytest.raises(ValueError):
+        parts.get_parents_of(blade, "weapon_slot_weapons")
+
+def test_used_in_covers_relations_and_foreign_keys(db: DataBaseWrapper):
+    inter = seed(db, templates=1)
+    slots = inter.managers["weapon_slots"]
+    slot = slots.get_models()[0]
+
+    used_in = slots.get_used_in([slot])[slot.id]
+    assert sorted(r.entity for r in used_in) == ["actual_minifigures", "template_minifigures"]
+    assert count_queries(db, lambda: slots.get_used_in([slot.id, "missing"])) == 2
+    assert not inter.managers["actual_minifigures"].has_parents()
+
+def test_used_in_pages(db: DataBaseWrapper):
+    inter = seed(db, templates=3)
+    colors = inter.managers["colors"]
+    # RED: Torso von drei Templates, BLACK: Klinge von drei Waffen, beide über einen Foreign Key
+    assert list(colors.used_in_sources()) == ["lego_parts.bricklink_color_id"]
+    expected = sorted(r.id for r in colors.get_used_in([RED])[RED.id])
+    assert len(expected) == 3
+
+    first, cursor = colors.get_used_in_page(RED, limit=2)
+    assert [r.id for r in first] == expected[:2]
+    assert cursor == ("lego_parts.bricklink_color_id", expected[1])
+    rest, cursor = colors.get_used_in_page(RED, 2, *cursor)
+    assert [r.id for r in rest] == expected[2:] and cursor is None
+
+    # über mehrere Quellen hinweg: Relation zu den Templates, dann Foreign Key der Figuren
+    slots = inter.managers["weapon_slots"]
+    slot = slots.get_models()[0]
+    page, cursor = slots.get_used_in_page(slot, limit=1)
+    assert [r.entity for r in page] == ["template_minifigures"]
+    assert cursor == ("actual_minifigures.weapon_slot_id", None)
+    page, cursor = slots.get_used_in_page(slot, 1, *cursor)
+    assert [r.entity for r in page] == ["actual_minifigures"] and cursor is None
+
+    with pytest.raises(ValueError):
+        slots.get_used_in_page(slot, 1, source="nope")
+
+def test_lazy_relations_load_on_first_access(db: DataBaseWrapper):
+    seed(db, templates=3)
+    eager = TemplateMinifigureRepoManager(db).get_models()
+    lazy_mng = TemplateMinifigureRepoManager(db, lazy=True)
+
+    # nur die Tabelle selbst, keine Joint Table
+    assert count_queries(db, lazy_mng.get_models) == 1
+
+    with identity_scope():
+        lazy = lazy_mng.get_models()
+        assert all(isinstance(t.parts, LazyRelation) for t in lazy)
+        assert [t.id for t in lazy] == [t.id for t in eager]
+
+        # ids und Anzahl aus der Joint Table, eine Query für alle Templates
+        assert count_queries(db, lambda: [relation_ids(t.parts) for t in lazy]) == 1
+        assert [len(t.parts) for t in lazy] == [1, 1, 1]
+
+        # Hash und Gleichheit wie bei eager geladenen Models
+        assert {hash(t) for t in lazy} == {hash(t) for t in eager}
+        assert lazy == eager
+        torso = next(iter(eager[0].parts))
+        assert torso in lazy[0].parts and torso not in lazy[1].parts
+
+def test_lazy_models_are_not_cached(db: DataBaseWrapper):
+    seed(db, templates=2)
+    cache = configure_model_cache(db)
+    try:
+        lazy = TemplateMinifigureRepoManager(db, lazy=True).get_models()
+        assert all(isinstance(t.parts, LazyRelation) for t in lazy)
+        assert cache.stats().size == 0 and cache.get_table(TEMPLATE_MINIFIGURE_TABLE.name) is None
+
+        # ein eager Manager derselben Tabelle bekommt vollständig geladene Models
+        eager = TemplateMinifigureRepoManager(db).get_models()
+        assert not any(isinstance(t.parts, LazyRelation) for t in eager)
+        assert cache.get_table(TEMPLATE_MINIFIGURE_TABLE.name) is not None
+    finally:
+        disable_model_cache(db)
+
+def test_lazy_and_eager_managers_in_one_scope(db: DataBaseWrapper):
+    seed(db, templates=2)
+    cache = configure_model_cache(db)
+    try:
+        with identity_scope():
+            lazy = TemplateMinifigureRepoManager(db, lazy=True).get_models()
+            eager = TemplateMinifigureRepoManager(db).get_models()
+            assert all(isinstance(t.parts, LazyRelation) for t in lazy)
+            assert not any(isinstance(t.parts, LazyRelation) for t in eager)
+            # innerhalb eines Modus bleibt es ein Objekt pro Zeile
+            assert TemplateMinifigureRepoManager(db, lazy=True).get_models()[0] is lazy[0]
+
+        cached = cache.get_table(TEMPLATE_MINIFIGURE_TABLE.name)
+        assert cached and not any(isinstance(t.parts, LazyRelation) for t in cached)
+    finally:
+        disable_model_cache(db)
+
+def test_generated_converter_round_trip():
+    torso = LegoPart(bricklink_part_id="torso", bricklink_color=RED)
+    template = TemplateMinifigure(bricklink_fig_id="cas001", name="Knight", sets=frozenset({"6080", "375"}), parts={torso: 2})
+    converter = get_converter(TemplateMinifigure, TEMPLATE_MINIFIGURE_TABLE)
+    assert get_converter(TemplateMinifigure, TEMPLATE_MINIFIGURE_TABLE) is converter
+
+    row = converter.to_row(template)
+    assert row == (template.id, "cas001", "Knight", "", "375,6080", "")
+    related = {TEMPLATE_PARTS_JOINT: {template.id: {torso: 2}}, TEMPLATE_WEAPON_SLOTS_JOINT: {template.id: {}}}
+    copy = converter.from_row(TEMPLATE_MINIFIGURE_TABLE.row_type(row), related)
+    assert copy == template and copy.sets == template.sets
+
+    with pytest.raises(ValueError):
+        get_converter(TemplateMinifigure, LEGO_PART_TABLE)
+
+def test_hash_follows_id():
+    blade = LegoPart(bricklink_part_id="blade", bricklink_color=BLACK)
+    hilt = LegoPart(bricklink_part_id="hilt", bricklink_color=BLACK)
+    sword = Weapon(name="Sword", parts={blade: 1, hilt: 1})
+    same = Weapon(name="Sword", parts={hilt: 1, blade: 1})
+    other = Weapon(name="Sword", parts={blade: 2, hilt: 1})
+
+    assert sword == same and hash(sword) == hash(same) == hash(sword.id)
+    assert sword != other
+    assert WeaponSlot(weapons={sword: 1}) in {WeaponSlot(weapons={same: 1})}
+
+def test_from_db_keeps_stored_id():
+    color = Color._from_db("stored", bricklink_color_id="5", name=None)
+    assert color.id == "stored" and color.name is None and color.rebrickable_color_id == ""
+    slot = WeaponSlot._from_db("slot", weapons=None)
+    assert slot.weapons == {}
+
+    Color.verify_db_ids = True
+    try:
+        assert Color._from_db(RED.id, bricklink_color_id="5", name="Red") == RED
+        with pytest.raises(ValueError):
+            Color._from_db("stored", bricklink_color_id="5")
+    finally:
+        Color.verify_db_ids = False
@@ -0,0 +1,115 @@
+import json
+import os
+import uuid
+import pytest
+from backend.lego_db import LegoDBInterface, LegoPart, Weapon, Color, TemplateMinifigure
+from backend.sql_api import DataBaseWrapper
+from frontend.api_managers import WeaponWebManager, get_row_cache
+from frontend.lego_web.app import create_app
+
+BLACK = Color(bricklink_color_id="11", name="Black")
+
+@pytest.fixture
+def app_db():
+    # die App öffnet ihre eigene Datenbank, zum Schreiben im Test eine zweite Verbindung
+    name = f"pytest_{uuid.uuid4().hex}.db"
+    app = create_app(name)
+    db = DataBaseWrapper(name)
+    yield app.test_client(), db
+    db.close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db.db_name + suffix):
+            os.remove(db.db_name + suffix)
+
+def add_weapon(db: DataBaseWrapper, name: str):
+    blade = LegoPart(bricklink_part_id="blade", bricklink_color=BLACK)
+    LegoDBInterface(db).managers["weapons"].add_model(Weapon(name=name, parts={blade: 1}))
+
+def test_rows_are_lazy_and_cached_until_a_commit(db: DataBaseWrapper):
+    LegoDBInterface(db).create_all_tables()
+    LegoDBInterface(db).managers["colors"].add_model(BLACK)
+    add_weapon(db, "Sword")
+
+    loads = []
+    mng = WeaponWebManager(db)
+    get_models = mng.repo_mng.get_models
+    mng.repo_mng.get_models = lambda **kwargs: loads.append(kwargs) or get_models(**kwargs)
+    assert loads == []
+
+    assert [row["Name"] for row in mng.rows] == ["Sword"]
+    assert mng.rows is mng.rows
+    assert mng.get_rows() == mng.rows and len(loads) == 1
+
+    add_weapon(db, "Axe")
+    assert sorted(row["Name"] for row in mng.get_rows()) == ["Axe", "Sword"]
+    assert len(loads) == 2
+    assert get_row_cache(db) is get_row_cache(db)
+
+def test_etag_answers_304_until_a_table_changes(app_db):
+    client, db = app_db
+    first = client.get("/lego_parts")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+
+    again = client.get("/lego_parts", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.data == b""
+    assert client.get("/api/lego_parts/ids", headers={"If-None-Match": etag}).status_code == 304
+    # andere Tabellen ändern die ETag nicht
+    LegoDBInterface(db).managers["template_minifigures"].add_model(TemplateMinifigure(bricklink_fig_id="cas001"))
+    assert client.get("/lego_parts", headers={"If-None-Match": etag}).status_code == 304
+
+    LegoDBInterface(db).managers["colors"].add_model(BLACK)
+    changed = client.get("/lego_parts", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+
+def test_export_streams_ndjson_and_csv(app_db):
+    client, db = app_db
+    LegoDBInterface(db).managers["colors"].add_model(BLACK)
+    for name in ("Sword", "Axe", "Spear"):
+        add_weapon(db, name)
+
+    response = client.get("/api/weapons/export?format=ndjson")
+    assert response.is_streamed and response.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert sorted(row["Name"] for row in rows) == ["Axe", "Spear", "Sword"]
+    assert {row["ID"] for row in rows} == set(LegoDBInterface(db).managers["weapons"].get_model_ids())
+
+    lines = client.get("/api/weapons/export?format=csv").data.decode().splitlines()
+    assert lines[0] == "ID,Name,Parts,Description" and len(lines) == 4
+    assert client.get("/api/weapons/export?format=xml").status_code == 400
+
+def test_iter_models_uses_bounded_batches(db: DataBaseWrapper):
+    inter = LegoDBInterface(db)
+    inter.create_all_tables()
+    inter.managers["colors"].add_model(BLACK)
+    for name in ("Sword", "Axe", "Spear"):
+        add_weapon(db, name)
+
+    batches = []
+    iter_records = db.iter_records
+    db.iter_records = lambda table, batch_size: (batches.append(len(b)) or b for b in iter_records(table, batch_size))
+    models = list(inter.iter_models("weapons", batch_size=2))
+    assert [m.id for m in models] == sorted(m.id for m in inter.get_models("weapons"))
+    assert batches == [2, 1]
+
+def test_sorted_page_continues_after_its_last_row_was_deleted(db: DataBaseWrapper):
+    inter = LegoDBInterface(db)
+    inter.create_all_tables()
+    inter.managers["colors"].add_model(BLACK)
+    for name in ("Axe", "Bow", "Club", "Dagger"):
+        add_weapon(db, name)
+
+    mng = WeaponWebManager(db)
+    query = mng.query_from_args({"sort": "name"})
+    first = mng.get_web_table(limit=2, query=query)
+    assert [row["Name"] for row in first.rows] == ["Axe", "Bow"]
+
+    weapons = inter.managers["weapons"]
+    weapons.delete_model(weapons.get_model_by_primary_key(first.rows[-1]["ID"]))
+    second = mng.get_web_table(after=first.next_after, limit=2, query=query)
+    assert [row["Name"] for row in second.rows] == ["Club", "Dagger"]
+    back = mng.get_web_table(before=second.prev_before, limit=2, query=query)
+    assert [row["Name"] for row in back.rows] == ["Axe"]
+
+    with pytest.raises(ValueError):
+        mng.get_web_table(after="~not-a-cursor", limit=2, query=query)
@@ -1,3 +1,3 @@
 from .web_managers import LegoPartWebManager, WeaponWebManager, WeaponSlotWebManager, TemplateMinifigureWebManager, ActualMinifigureWebManager, ColorWebManager
 from .web_models import WebTable
-from .base_web_managers import BaseWebManager
\ No newline at end of file
+from .base_web_managers import BaseWebManager, RowCache, get_row_cache
\ No newline at end of file
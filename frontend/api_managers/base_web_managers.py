@@ -1,32 +1,258 @@
 from backend.lego_db.db_converter import BaseRepoManager
 from backend.lego_db.lego_models import BasicModel
-from backend.sql_api import DataBaseWrapper
+from backend.sql_api import DataBaseWrapper, Query, Cursor, DEFAULT_CHUNK_SIZE
 from frontend.api_managers.web_models import WebTable
+from collections import OrderedDict
 from dataclasses import fields
-from typing import Mapping
+from typing import Iterator, Mapping
+import base64
+import binascii
+import json
+import threading
+import weakref
+
+# Query-String Filter: ?<attribut>__<lookup>=<wert>, ohne lookup ist es "="
+FILTER_LOOKUPS = {
+    "": "=",
+    "ne": "!=",
+    "lt": "<",
+    "lte": "<=",
+    "gt": ">",
+    "gte": ">=",
+    "in": "IN",
+    "prefix": "PREFIX",
+}
+# Argumente, die keine Filter sind
+RESERVED_ARGS = ("after", "before", "limit", "sort")
+# sortierte Seiten: after/before = CURSOR_PREFIX + base64(json [primary key, Sortierwert]), sonst nur der primary key
+CURSOR_PREFIX = "~"
+# so viele Seiten (ohne Filter) hält der RowCache pro Datenbank
+DEFAULT_ROW_CACHE_ENTRIES = 64
+
+class RowCache:
+    """
+    Rendered web rows shared by all requests, keyed by (entity, after, limit, before).
+    Everything is dropped as soon as PRAGMA data_version reports a commit.
+    """
+
+    def __init__(self, db: DataBaseWrapper, max_entries: int = DEFAULT_ROW_CACHE_ENTRIES):
+        self.db = db
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._rows: OrderedDict[tuple, list[dict[str, str]]] = OrderedDict()
+        self._data_version: int | None = None
+
+    def version(self) -> int:
+        """Current data version, rows built after this call are stored with it"""
+        with self._lock:
+            self._sync()
+            return self._data_version
+
+    def get(self, key: tuple) -> list[dict[str, str]] | None:
+        with self._lock:
+            self._sync()
+            rows = self._rows.get(key)
+            if rows is not None:
+                self._rows.move_to_end(key)
+            return rows
+
+    def put(self, key: tuple, rows: list[dict[str, str]], version: int):
+        with self._lock:
+            self._sync()
+            # inzwischen committete Änderungen -> die Zeilen sind evtl. schon veraltet
+            if version != self._data_version:
+                return
+            self._rows[key] = rows
+            self._rows.move_to_end(key)
+            while len(self._rows) > self.max_entries:
+                self._rows.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+
+    def _sync(self):
+        data_version = self.db.data_version()
+        if data_version != self._data_version:
+            self._rows.clear()
+            self._data_version = data_version
+
+_ROW_CACHES: "weakref.WeakKeyDictionary[DataBaseWrapper, RowCache]" = weakref.WeakKeyDictionary()
+_ROW_CACHES_LOCK = threading.Lock()
+
+def get_row_cache(db: DataBaseWrapper) -> RowCache:
+    with _ROW_CACHES_LOCK:
+        cache = _ROW_CACHES.get(db)
+        if cache is None:
+            cache = _ROW_CACHES[db] = RowCache(db)
+        return cache
+
+def encode_cursor(cursor: Cursor) -> str:
+    data = json.dumps([cursor.key, cursor.sort_value], ensure_ascii=False).encode()
+    return CURSOR_PREFIX + base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+def decode_cursor(value: str | None) -> Cursor | str | None:
+    """Cursor from an after/before argument, plain primary keys are returned unchanged"""
+    if value is None or not value.startswith(CURSOR_PREFIX):
+        return value
+    data = value[len(CURSOR_PREFIX):]
+    try:
+        key, sort_value = json.loads(base64.urlsafe_b64decode(data + "=" * (-len(data) % 4)))
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid page cursor '{value}'") from e
+    return Cursor(key, sort_value)
 
 class BaseWebManager:
     columns: list[str]
-    rows: dict[str, str]
     t_name: str
     entity: str
     repos: dict[str, BaseRepoManager]
+    # alle Zeilen, erst beim ersten Zugriff auf rows gebaut
+    _rows: list[dict[str, str]] | None = None
 
     def __init__(self, db: DataBaseWrapper):
         self.repo_mng = BaseRepoManager(db)
 
+    @property
+    def rows(self) -> list[dict[str, str]]:
+        """All rows, built on first access (a manager lives for one request)"""
+        if self._rows is None:
+            self._rows = self.get_rows()
+        return self._rows
+
     def get_columns(self) -> list[str]:
         return self.columns
     
-    def get_rows(self) -> list[dict[str, str]]:
-        raise NotImplementedError("get_rows not implemented")
+    def get_rows(self, after: str = None, limit: int = None, before: str = None, query: Query = None) -> list[dict[str, str]]:
+        if query is None:
+            # Seiten ohne Filter kommen aus dem RowCache, solange die Datenbank unverändert ist
+            cache = get_row_cache(self.repo_mng.db)
+            key = (self.entity, after, limit, before)
+            rows = cache.get(key)
+            if rows is None:
+                version = cache.version()
+                models = self.repo_mng.get_models(after=after, limit=limit, before=before)
+                rows = [self._row_from_model(m) for m in models]
+                cache.put(key, rows, version)
+            return list(rows)
+
+        models = self._find_page(query, after, limit, before)
+        return [self._row_from_model(m) for m in models]
+
+    def _find_page(self, query: Query, after: str | None, limit: int | None, before: str | None) -> list[BasicModel]:
+        query = query.limit(limit)
+        if after is not None:
+            query = query.after(decode_cursor(after))
+        elif before is not None:
+            query = query.before(decode_cursor(before))
+        return self.repo_mng.find_models(query)
+
+    def _cursor(self, query: Query, model: BasicModel) -> str:
+        """after/before value for model, sorted pages carry the sort value so a deleted row keeps its position"""
+        if query.order is None or query.order[0].primary_key:
+            return model.id
+        sort_attr = query.order[0]
+        values = self.repo_mng.converter.to_row(model)
+        sort_value = values[self.repo_mng.table.attributes.index(sort_attr)]
+        return encode_cursor(Cursor(model.id, sort_value))
+
+    def iter_rows(self, batch_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[dict[str, str]]:
+        """All rows as a stream with bounded memory (see BaseRepoManager.iter_models), e.g. for exports"""
+        for model in self.repo_mng.iter_models(batch_size):
+            yield self._row_from_model(model)
+
+    def query_from_args(self, args: Mapping[str, str]) -> Query | None:
+        """
+        Build a Query from query-string arguments, None if there are no filters.
+            ?name=Sword  ?year__gte=1990  ?id__in=a,b  ?description__prefix=Sw  ?sort=-year
+        """
+        query = self.repo_mng.query()
+        used = False
+
+        for key, raw in args.items():
+            if key in RESERVED_ARGS or raw == "":
+                continue
+            name, _, lookup = key.partition("__")
+            if lookup not in FILTER_LOOKUPS:
+                raise ValueError(f"Unknown filter '{lookup}' for '{name}'")
+
+            if name not in self._attribute_names():
+                raise ValueError(f"Unknown column '{name}'")
+            attr = self.repo_mng.table.get_attribute_by_name(name)
+
+            operator = FILTER_LOOKUPS[lookup]
+            if operator == "IN":
+                value = [self._coerce(attr.type, v) for v in raw.split(",")]
+            else:
+                value = self._coerce(attr.type, raw)
+            query = query.where(attr, operator, value)
+            used = True
+
+        sort = args.get("sort")
+        if sort:
+            name = sort.lstrip("-")
+            if name not in self._attribute_names():
+                raise ValueError(f"Unknown column '{name}'")
+            query = query.order_by(name, descending=sort.startswith("-"))
+            used = True
+
+        return query if used else None
+
+    def _attribute_names(self) -> list[str]:
+        return [attr.name for attr in self.repo_mng.table.attributes]
+
+    def _coerce(self, sql_type: str, raw: str):
+        sql_type = sql_type.upper()
+        if sql_type == "INTEGER":
+            return int(raw)
+        if sql_type == "REAL":
+            return float(raw)
+        return raw
+
+    def _row_from_model(self, m: BasicModel) -> dict[str, str]:
+        raise NotImplementedError("_row_from_model not implemented")
     
-    def get_web_table(self) -> WebTable:
+    def get_web_table(self, after: str = None, before: str = None, limit: int = None, query: Query = None) -> WebTable:
+        """Whole table, or one keyset page of at most limit rows when limit is given"""
+        if limit is None:
+            return WebTable(
+                entity=self.entity,
+                name=self.t_name,
+                columns=self.get_columns(),
+                rows=self.get_rows(after=after, before=before, query=query)
+            )
+
+        # eine Zeile mehr laden, um zu wissen ob es noch eine weitere Seite gibt
+        if query is None:
+            rows = self.get_rows(after=after, limit=limit + 1, before=before)
+            cursors = [row[self.columns[0]] for row in rows]
+        else:
+            models = self._find_page(query, after, limit + 1, before)
+            rows = [self._row_from_model(m) for m in models]
+            cursors = [self._cursor(query, m) for m in models]
+        has_more = len(rows) > limit
+        next_after = prev_before = None
+
+        if before is None:
+            rows, cursors = rows[:limit], cursors[:limit]
+            if has_more:
+                next_after = cursors[-1]
+            if after is not None and rows:
+                prev_before = cursors[0]
+        else:
+            if has_more:
+                rows, cursors = rows[1:], cursors[1:]
+                prev_before = cursors[0]
+            if rows:
+                next_after = cursors[-1]
+
         return WebTable(
             entity=self.entity,
             name=self.t_name,
             columns=self.get_columns(),
-            rows=self.get_rows()
+            rows=rows,
+            next_after=next_after,
+            prev_before=prev_before
         )
     
     def get_model_ids(self) -> list[str]:
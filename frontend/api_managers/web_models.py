@@ -5,4 +5,7 @@ class WebTable:
     name: str
     entity: str
     columns: list[str]
-    rows: list[dict[str, str]]
\ No newline at end of file
+    rows: list[dict[str, str]]
+    # Keyset Pagination: id für "weiter" bzw. "zurück", None wenn es keine Seite mehr gibt
+    next_after: str | None = None
+    prev_before: str | None = None
\ No newline at end of file
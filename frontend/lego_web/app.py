@@ -1,14 +1,34 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify, flash, abort
+from flask import Flask, render_template, request, redirect, url_for, jsonify, flash, abort, g, make_response, session, Response, stream_with_context
 from frontend.api_managers import LegoPartWebManager, WeaponWebManager, WeaponSlotWebManager, TemplateMinifigureWebManager, ActualMinifigureWebManager, WebTable, BaseWebManager, ColorWebManager
 from backend.lego_db import LegoDBInterface, PRIMARY_KEY_NAME, WEAPON_PART_TABLE
+from backend.lego_db.db_converter import identity_scope, configure_model_cache
 from backend.sql_api import DataBaseWrapper
-from dataclasses import fields
+from dataclasses import fields, asdict
+import atexit
+import csv
+import io
+import json
+from typing import Callable, Iterator
 import traceback
 from backend.file_reader.get_info import import_csv
-
-def create_app():
-
-    db = DataBaseWrapper("database.db")
+from backend.file_reader.converter.conversion_rules import CONVERSION_RULES
+
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+SEARCH_LIMIT = 20
+SEARCH_RESULTS = 50
+# Zeilen pro Batch beim Export, so viele Models liegen höchstens gleichzeitig im Speicher
+EXPORT_BATCH_SIZE = 500
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+def create_app(db_name: str = "database.db"):
+
+    db = DataBaseWrapper(db_name)
+    atexit.register(db.close)
+    model_cache = configure_model_cache(db)
     WEB_MANAGERS = {
         "colors": ColorWebManager,
         "lego_parts": LegoPartWebManager,
@@ -42,6 +62,25 @@ def create_app():
 
     app = Flask(__name__)
     app.secret_key = "dev-secret-key"
+    # Anzahl Prozesse für CSV Importe, None = Import im Request-Prozess
+    app.config.setdefault("IMPORT_WORKERS", None)
+
+    @app.before_request
+    def open_identity_scope():
+        # alle Repo Manager eines Requests teilen sich eine Identity Map
+        g.identity_scope = identity_scope()
+        g.identity_scope.__enter__()
+
+    @app.teardown_request
+    def close_identity_scope(exc):
+        scope = g.pop("identity_scope", None)
+        if scope is not None:
+            scope.__exit__(None, None, None)
+
+    @app.teardown_appcontext
+    def release_db(exc):
+        # Verbindung des Request-Threads zurück in den Pool
+        db.release()
 
     @app.context_processor
     def inject_entities():
@@ -57,36 +96,30 @@ def create_app():
     
     @app.route("/colors")
     def render_colors():
-        mng = ColorWebManager(db)
-        return render_generic(web_mng=mng)
+        return conditional("colors", lambda: render_generic(web_mng=ColorWebManager(db)))
 
     @app.route("/lego_parts")
     def render_lego_parts():
-        mng = LegoPartWebManager(db)
-        return render_generic(web_mng=mng)
+        return conditional("lego_parts", lambda: render_generic(web_mng=LegoPartWebManager(db)))
 
     @app.route("/weapons")
     def render_weapons():
-        mng = WeaponWebManager(db)
-        return render_generic(web_mng=mng)
+        return conditional("weapons", lambda: render_generic(web_mng=WeaponWebManager(db)))
 
 
     @app.route("/weapon_slots")
     def render_weapon_slots():
-        mng = WeaponSlotWebManager(db)
-        return render_generic(web_mng=mng)
+        return conditional("weapon_slots", lambda: render_generic(web_mng=WeaponSlotWebManager(db)))
 
 
     @app.route("/template_minifigures")
     def render_template_minifigures():
-        mng = TemplateMinifigureWebManager(db)
-        return render_generic(web_mng=mng)
+        return conditional("template_minifigures", lambda: render_generic(web_mng=TemplateMinifigureWebManager(db)))
 
 
     @app.route("/actual_minifigures")
     def render_actual_minifigures():
-        mng = ActualMinifigureWebManager(db)
-        return render_generic(web_mng=mng)
+        return conditional("actual_minifigures", lambda: render_generic(web_mng=ActualMinifigureWebManager(db)))
 
     @app.route("/add_form/<entity>", methods=["GET", "POST"])
     def add_form(entity):
@@ -140,13 +173,74 @@ def create_app():
 
         return redirect(url_for(ENTITY_ROUTES[entity]))
 
+    @app.route("/<entity>/used_in")
+    def used_in(entity):
+        if entity not in db_inter.managers:
+            abort(404)
+        obj_id = request.args.get("id", "")
+        source = request.args.get("source") or None
+        after = request.args.get("after") or None
+        repo_manager = db_inter.managers[entity]
+        # wie die Entity Seiten nur eine Seite, ein häufig benutztes Teil kann sehr viele Parents haben
+        try:
+            parents, next_page = repo_manager.get_used_in_page(obj_id, PAGE_SIZE, source, after)
+        except ValueError:
+            abort(404)
+        return render_template(
+            "used_in.html",
+            entity=entity,
+            obj_id=obj_id,
+            parents=parents,
+            next_page=next_page,
+            first_page=source is not None
+        )
+
+    @app.route("/api/db_stats")
+    def db_stats():
+        return jsonify(pool=asdict(db.pool_stats()), model_cache=asdict(model_cache.stats()))
+
     @app.route("/api/<entity>/ids")
     def get_ids(entity):
         mng_cls = WEB_MANAGERS.get(entity)
-        mng : BaseWebManager = mng_cls(db)
-        data = mng.get_model_ids()
-        return jsonify(data)
+        if mng_cls is None:
+            abort(404)
+        return conditional(entity, lambda: jsonify(mng_cls(db).get_model_ids()))
     
+    @app.route("/api/<entity>/export")
+    def export(entity):
+        # streamt alle Zeilen direkt vom Cursor, die Relationen flach wie in der Tabellenansicht
+        mng_cls = WEB_MANAGERS.get(entity)
+        if mng_cls is None:
+            abort(404)
+        fmt = request.args.get("format", "ndjson")
+        if fmt not in EXPORT_FORMATS:
+            abort(400, f"Unknown export format '{fmt}'")
+
+        def build():
+            web_mng: BaseWebManager = mng_cls(db)
+            rows = web_mng.iter_rows(EXPORT_BATCH_SIZE)
+            chunks = export_ndjson(rows) if fmt == "ndjson" else export_csv(web_mng.get_columns(), rows)
+            # stream_with_context: Request (und damit die Verbindung des Threads) bleibt bis zum Ende offen
+            response = Response(stream_with_context(chunks), mimetype=EXPORT_FORMATS[fmt])
+            response.headers["Content-Disposition"] = f"attachment; filename={entity}.{fmt}"
+            return response
+        return conditional(entity, build)
+
+    @app.route("/search")
+    def global_search():
+        text = request.args.get("q", "").strip()
+        hits = db_inter.search(text, SEARCH_RESULTS) if text else []
+        return render_template("search.html", query=text, hits=hits)
+
+    @app.route("/api/<entity>/search")
+    def search(entity):
+        # Autocomplete: Präfix-Suche über Index, liefert nur die Suchspalten, keine Models
+        if entity not in db_inter.managers:
+            abort(404)
+        text = request.args.get("q", "").strip()
+        limit = max(1, min(request.args.get("limit", SEARCH_LIMIT, type=int), MAX_PAGE_SIZE))
+        return conditional(entity, lambda: jsonify(db_inter.managers[entity].search_prefix(text, limit)))
+
     @app.route("/<entity>/upload_csv", methods=["POST"])
     def upload_csv(entity):
         if entity not in WEB_MANAGERS:
@@ -157,10 +251,12 @@ def create_app():
             flash("Please upload a csv", "error")
             return redirect(url_for(ENTITY_ROUTES[entity]))
 
+        source = request.form.get("source", "rebrickable")
         try:
-            rows = import_csv(file)
-            print(rows)
-            flash("CSV imported", "success")
+            report = import_csv(file, entity, db, source, workers=app.config["IMPORT_WORKERS"])
+            for error in report.errors:
+                app.logger.warning("CSV import into '%s': %s", entity, error)
+            flash(report.summary(), "error" if report.failed else "success")
         except Exception as e:
             traceback.print_exc()
             flash(str(e), "error")
@@ -168,8 +264,73 @@ def create_app():
         return redirect(url_for(ENTITY_ROUTES[entity]))
 
     # --- Helper ---
+    def conditional(entity: str, build: Callable):
+        """
+        Response with an ETag from the table versions behind entity. A matching
+        If-None-Match is answered with 304 before build (and any repo manager) runs.
+        """
+        etag = f"{entity}-{db_inter.version_tag(entity)}"
+        # ausstehende Flash-Meldungen stehen nur in einer neu gerenderten Seite
+        if request.if_none_match.contains(etag) and not session.get("_flashes"):
+            response = make_response("", 304)
+        else:
+            response = make_response(build())
+        response.set_etag(etag)
+        # der Browser darf die Seite speichern, muss aber jedes Mal nachfragen
+        response.cache_control.no_cache = True
+        return response
+
+    def export_ndjson(rows: Iterator[dict]) -> Iterator[str]:
+        for row in rows:
+            yield json.dumps(row, ensure_ascii=False) + "\n"
+
+    def export_csv(columns: list[str], rows: Iterator[dict]) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns)
+
+        def flush() -> str:
+            text = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return text
+
+        # Header sofort senden, danach eine Zeile pro Chunk
+        writer.writeheader()
+        yield flush()
+        for row in rows:
+            writer.writerow(row)
+            yield flush()
+
     def render_generic(web_mng: BaseWebManager):
-        web_table = web_mng.get_web_table()
-        return render_template("generic.html", title=web_table.name, columns=web_table.columns, rows=web_table.rows, entity=web_table.entity)
+        after = request.args.get("after") or None
+        before = request.args.get("before") or None
+        limit = request.args.get("limit", PAGE_SIZE, type=int)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        try:
+            query = web_mng.query_from_args(request.args)
+        except ValueError as e:
+            abort(400, str(e))
+        # Filter und Sortierung bleiben beim Blättern erhalten
+        filter_args = {k: v for k, v in request.args.items() if k not in ("after", "before", "limit") and v != ""}
+
+        try:
+            web_table = web_mng.get_web_table(after=after, before=before, limit=limit, query=query)
+        except ValueError as e:
+            # ungültiger Cursor
+            abort(400, str(e))
+        return render_template(
+            "generic.html",
+            title=web_table.name,
+            columns=web_table.columns,
+            rows=web_table.rows,
+            entity=web_table.entity,
+            next_after=web_table.next_after,
+            prev_before=web_table.prev_before,
+            limit=limit,
+            filter_args=filter_args,
+            has_used_in=db_inter.managers[web_table.entity].has_parents(),
+            import_sources=[source for source, rules in CONVERSION_RULES.items() if web_table.entity in rules]
+        )
     
     return app